@@ -0,0 +1,183 @@
+"""Local stand-in for the YouTube Data API, for benchmarks and load tests.
+
+Serves ``videos`` and ``commentThreads`` for synthetic videos whose comments
+are generated on the fly from the video ID and position, so a million-comment
+video costs no memory and every run sees the same data. Responses carry an
+ETag and honour If-None-Match, as the real API does. Point the backend at
+it with YOUTUBE_API_BASE_URL, or mount it in-process through
+``httpx.ASGITransport(app=create_app(...))``.
+
+    FAKE_YOUTUBE_COMMENTS=100000 FAKE_YOUTUBE_PAGE_LATENCY_MS=50 \\
+        uvicorn fake_youtube:app --port 8002
+"""
+import asyncio
+import hashlib
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+import orjson
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import ORJSONResponse
+
+
+# 🧪 Fake API settings
+FAKE_YOUTUBE_COMMENTS = int(os.environ.get('FAKE_YOUTUBE_COMMENTS', '1000'))  # comments on videos not registered explicitly
+FAKE_YOUTUBE_PAGE_LATENCY_MS = float(os.environ.get('FAKE_YOUTUBE_PAGE_LATENCY_MS', '0'))
+FAKE_YOUTUBE_ERROR_RATE = float(os.environ.get('FAKE_YOUTUBE_ERROR_RATE', '0'))  # share of calls failing with backendError
+FAKE_YOUTUBE_SEED = int(os.environ.get('FAKE_YOUTUBE_SEED', '1'))
+FAKE_YOUTUBE_BOT_EVERY = 25      # every Nth comment is copy-paste spam from a throwaway handle
+FAKE_YOUTUBE_AUTHOR_RATIO = 0.6  # distinct authors per comment, so some viewers comment twice
+FAKE_YOUTUBE_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+WORDS = (
+    'giveaway', 'love', 'this', 'video', 'great', 'content', 'thanks', 'for', 'sharing', 'awesome',
+    'please', 'pick', 'me', 'amazing', 'channel', 'subscribed', 'keep', 'it', 'up', 'best',
+    'tutorial', 'ever', 'wow', 'nice', 'editing', 'music', 'first', 'time', 'here', 'hello',
+)
+SPAM_TEXTS = (
+    'Check my channel for FREE gifts!!! http://free-gifts.example',
+    'I made $5000 this week, WhatsApp me +1 555 010 9999',
+    'Congratulations! You won, message me on telegram to claim',
+)
+
+
+class FakeYouTube:
+    """Synthetic comment data and the knobs a benchmark turns"""
+
+    def __init__(self, default_comments: int = FAKE_YOUTUBE_COMMENTS,
+                 page_latency_ms: float = FAKE_YOUTUBE_PAGE_LATENCY_MS,
+                 error_rate: float = FAKE_YOUTUBE_ERROR_RATE, seed: int = FAKE_YOUTUBE_SEED):
+        self.default_comments = default_comments
+        self.comment_counts: Dict[str, int] = {}
+        self.page_latency = page_latency_ms / 1000
+        self.error_rate = error_rate
+        self.seed = seed
+        self.errors = random.Random(seed)
+        self.calls: Dict[str, int] = {'videos': 0, 'commentThreads': 0}
+        self.not_modified = 0
+
+    def add_video(self, video_id: str, comments: int):
+        self.comment_counts[video_id] = comments
+
+    def comment_total(self, video_id: str) -> int:
+        return self.comment_counts.get(video_id, self.default_comments)
+
+    def comment(self, video_id: str, position: int) -> dict:
+        """The comment at ``position`` in newest-first order.
+
+        Comments are numbered oldest first, so raising a video's count adds
+        new comments on top and leaves the existing ones as they were.
+        """
+        total = self.comment_total(video_id)
+        number = total - 1 - position
+        rng = random.Random(f'{self.seed}:{video_id}:{number}')
+        published_at = FAKE_YOUTUBE_EPOCH + timedelta(seconds=30 * number)
+        if number % FAKE_YOUTUBE_BOT_EVERY == FAKE_YOUTUBE_BOT_EVERY - 1:
+            author = f'@user-{rng.randrange(16 ** 6):06x}'
+            text = SPAM_TEXTS[number // FAKE_YOUTUBE_BOT_EVERY % len(SPAM_TEXTS)]
+        else:
+            author = f'@viewer{rng.randrange(int(number * FAKE_YOUTUBE_AUTHOR_RATIO) + 1)}'
+            text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 14)))
+
+        comment_id = f'Ug{video_id}{number:08d}'
+        return {
+            'id': comment_id,
+            'snippet': {
+                'videoId': video_id,
+                'totalReplyCount': 0,
+                'topLevelComment': {
+                    'id': comment_id,
+                    'snippet': {
+                        'authorDisplayName': author,
+                        'authorProfileImageUrl': 'https://yt3.ggpht.com/fake',
+                        'authorChannelUrl': f'http://www.youtube.com/{author}',
+                        'textDisplay': text,
+                        'likeCount': rng.randrange(50) if rng.random() < 0.3 else 0,
+                        'publishedAt': published_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    }
+                }
+            }
+        }
+
+    async def respond(self, resource: str) -> Optional[ORJSONResponse]:
+        """Count the call, wait out the page latency and maybe inject a failure"""
+        self.calls[resource] += 1
+        if self.page_latency:
+            await asyncio.sleep(self.page_latency)
+        if self.error_rate and self.errors.random() < self.error_rate:
+            return youtube_error(503, 'backendError', "The service is currently unavailable.")
+        return None
+
+
+def youtube_error(status: int, reason: str, message: str) -> ORJSONResponse:
+    return ORJSONResponse(
+        {'error': {'code': status, 'message': message, 'errors': [{'reason': reason, 'message': message}]}},
+        status_code=status
+    )
+
+
+def respond_with_etag(request: Request, fake: FakeYouTube, body: dict) -> Response:
+    etag = '"' + hashlib.sha1(orjson.dumps(body)).hexdigest() + '"'
+    if request.headers.get('if-none-match') == etag:
+        fake.not_modified += 1
+        return Response(status_code=304, headers={'ETag': etag})
+    return ORJSONResponse({**body, 'etag': etag}, headers={'ETag': etag})
+
+
+def create_app(fake: Optional[FakeYouTube] = None) -> FastAPI:
+    fake = fake or FakeYouTube()
+    fake_app = FastAPI(default_response_class=ORJSONResponse)
+    fake_app.state.fake = fake
+
+    @fake_app.get('/videos')
+    async def list_videos(id: str, request: Request):
+        error = await fake.respond('videos')
+        if error is not None:
+            return error
+
+        items = []
+        for video_id in id.split(','):
+            items.append({
+                'id': video_id,
+                'snippet': {
+                    'title': f'Benchmark video {video_id}',
+                    'channelTitle': 'Benchmark channel',
+                    'thumbnails': {'high': {'url': f'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg'}},
+                },
+                'statistics': {
+                    'viewCount': str(fake.comment_total(video_id) * 40),
+                    'likeCount': str(fake.comment_total(video_id) * 2),
+                    'commentCount': str(fake.comment_total(video_id)),
+                }
+            })
+        return respond_with_etag(request, fake, {'kind': 'youtube#videoListResponse', 'items': items})
+
+    @fake_app.get('/commentThreads')
+    async def list_comment_threads(request: Request, videoId: str, maxResults: int = 20,
+                                   pageToken: Optional[str] = None):
+        error = await fake.respond('commentThreads')
+        if error is not None:
+            return error
+
+        try:
+            start = int(pageToken or 0)
+        except ValueError:
+            return youtube_error(400, 'invalidPageToken', "The request specifies an invalid page token.")
+        total = fake.comment_total(videoId)
+        end = min(start + max(1, min(maxResults, 100)), total)
+
+        body = {
+            'kind': 'youtube#commentThreadListResponse',
+            'pageInfo': {'totalResults': end - start, 'resultsPerPage': maxResults},
+            'items': [fake.comment(videoId, position) for position in range(start, end)],
+        }
+        if end < total:
+            body['nextPageToken'] = str(end)
+        return respond_with_etag(request, fake, body)
+
+    return fake_app
+
+
+app = create_app()
@@ -1,17 +1,44 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from cachetools import LRUCache, TTLCache
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel
-from typing import List, Optional
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-import random
+from pydantic import BaseModel, Field
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Literal, Optional, Sequence, Tuple
+from collections import Counter
+from contextlib import aclosing, asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from operator import attrgetter
+from zoneinfo import ZoneInfo
+from array import array
+import asyncio
+import base64
+import binascii
+import bisect
+import brotli
+import hashlib
+import heapq
+import hmac
+import itertools
+import math
+import httpx
+import numpy as np
+import orjson
 import re
+import secrets
+import sys
 import time
+import uuid
+import zlib
 
 
 ROOT_DIR = Path(__file__).parent
@@ -21,19 +48,106 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # 🔒 Rate limiting settings
-RATE_LIMIT = 30            # max requests per IP
-RATE_LIMIT_WINDOW = 60    # seconds
-
-# In-memory store for IP request timestamps
-ip_requests = {}
+RATE_LIMITS = {            # route -> (max requests per IP, window in seconds)
+    'fetch': (30, 60),
+    'draw': (60, 60),
+    'browse': (240, 60),
+    'jobs': (300, 60),
+    'verify': (30, 60),  # each verify reloads the draw's whole pool
+}
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # 'mongo' shares limits across workers
+RATE_LIMIT_MAX_KEYS = 100_000  # least recently used counters are evicted beyond this
 
 api_router = APIRouter(prefix="/api")
 
 
 YOUTUBE_API_KEY = os.environ['YOUTUBE_API_KEY']
+YOUTUBE_API_BASE_URL = os.environ.get('YOUTUBE_API_BASE_URL', 'https://www.googleapis.com/youtube/v3')
+YOUTUBE_API_TIMEOUT = 15.0  # seconds per API round-trip
+YOUTUBE_MAX_CONNECTIONS = int(os.environ.get('YOUTUBE_MAX_CONNECTIONS', '20'))
+
+# 📊 YouTube quota settings
+YOUTUBE_DAILY_QUOTA = int(os.environ.get('YOUTUBE_DAILY_QUOTA', '10000'))
+YOUTUBE_QUOTA_COSTS = {    # units per call, from the Data API quota calculator
+    'videos': 1,
+    'commentThreads': 1,
+    'comments': 1,
+    'channels': 1,
+    'playlistItems': 1,
+}
+YOUTUBE_QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')  # quota resets at midnight Pacific
+QUOTA_TIGHT_FRACTION = 0.2   # below this share of the budget left, fetches are queued
+QUOTA_TIGHT_CONCURRENCY = 2  # fetches allowed to page at once while queued
+QUOTA_QUEUE_TIMEOUT = 30     # seconds a queued fetch waits before giving up
+
+# 🏷️ Conditional request settings
+YOUTUBE_ETAG_CACHE_SIZE = int(os.environ.get('YOUTUBE_ETAG_CACHE_SIZE', '512'))  # parsed responses kept in memory per worker
+VIDEO_INFO_FRESH_SECONDS = int(os.environ.get('VIDEO_INFO_FRESH_SECONDS', '60'))  # served from memory without revalidating
+
+# 💬 Reply fetching settings
+YOUTUBE_INLINE_REPLIES = 5  # replies commentThreads returns inline with each thread
+REPLY_FETCH_CONCURRENCY = int(os.environ.get('REPLY_FETCH_CONCURRENCY', '8'))  # reply threads paged at once per video
+
+# 🎁 Multi-video giveaway settings
+MAX_GIVEAWAY_VIDEOS = int(os.environ.get('MAX_GIVEAWAY_VIDEOS', '50'))
+GIVEAWAY_VIDEO_CONCURRENCY = int(os.environ.get('GIVEAWAY_VIDEO_CONCURRENCY', '20'))  # videos fetched at once per giveaway
+
+# 🧵 Background fetch job settings
+FETCH_JOB_WORKERS = int(os.environ.get('FETCH_JOB_WORKERS', '4'))  # jobs paging at once per worker process
+FETCH_JOB_QUEUE_SIZE = int(os.environ.get('FETCH_JOB_QUEUE_SIZE', '500'))  # submissions beyond this are turned away
+FETCH_JOB_TTL_SECONDS = int(os.environ.get('FETCH_JOB_TTL_SECONDS', '86400'))
+FETCH_JOB_POLL_SECONDS = 1.0        # how often an event stream checks a job run by another process
+FETCH_JOB_KEEPALIVE_SECONDS = 15.0  # idle event streams get a comment line so proxies keep them open
+FETCH_JOB_RETRY_AFTER_SECONDS = 10  # sent with the 503 when the queue is full
+
+# 🗄️ Comment cache settings
+COMMENT_CACHE_FRESH_SECONDS = int(os.environ.get('COMMENT_CACHE_FRESH_SECONDS', '300'))
+COMMENT_CACHE_TTL_SECONDS = int(os.environ.get('COMMENT_CACHE_TTL_SECONDS', '86400'))
+COMMENT_SESSION_TTL_SECONDS = int(os.environ.get('COMMENT_SESSION_TTL_SECONDS', str(COMMENT_CACHE_TTL_SECONDS)))
+
+# 📦 Response encoding settings
+COMPRESSION_MINIMUM_SIZE = 1024  # bytes; smaller responses are sent as-is
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # fast enough to run per request, well ahead of gzip on JSON
+
+# 📄 Comment browsing settings
+BROWSE_PAGE_SIZE = 50
+BROWSE_MAX_PAGE_SIZE = 200
+BROWSE_SORTS = {  # sort name -> (key field, direction); comment_id breaks ties
+    'newest': ('published_at', -1),
+    'oldest': ('published_at', 1),
+    'likes': ('like_count', -1),
+}
+BROWSE_KEY_TYPES = {'published_at': str, 'like_count': int}  # what a cursor's key must be for each sort field
+
+# 📈 Metrics settings
+METRICS_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+METRICS_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+METRICS = {  # name -> (type, help, buckets for histograms)
+    'http_request_duration_seconds': ('histogram', "API request latency by route", METRICS_LATENCY_BUCKETS),
+    'stage_duration_seconds': ('histogram', "Time spent in each hot-path stage", METRICS_LATENCY_BUCKETS),
+    'youtube_request_duration_seconds': ('histogram', "YouTube Data API round-trip time", METRICS_LATENCY_BUCKETS),
+    'youtube_calls_per_request': ('histogram', "YouTube API calls made while serving one request", METRICS_COUNT_BUCKETS),
+    'youtube_pages_per_request': ('histogram', "Comment and reply pages read while serving one request", METRICS_COUNT_BUCKETS),
+    'quota_units_per_request': ('histogram', "YouTube quota units spent while serving one request", METRICS_COUNT_BUCKETS),
+    'youtube_api_calls_total': ('counter', "YouTube Data API calls by resource and outcome", None),
+    'youtube_quota_units_total': ('counter', "YouTube quota units spent by resource", None),
+    'comment_cache_lookups_total': ('counter', "Comment cache lookups by result (hit, stale, miss)", None),
+    'etag_cache_lookups_total': ('counter', "Stored YouTube response lookups by result (memory, store, miss)", None),
+    'rate_limit_rejections_total': ('counter', "Requests rejected by the per-IP rate limiter", None),
+    'quota_rejections_total': ('counter', "Fetches rejected because the daily quota could not cover them", None),
+}
+
+# 🎲 Draw settings
+DRAW_ALGORITHM = 'hmac-sha256-fisher-yates-v1'  # Bump when the replay procedure changes
+
+# 🤖 Bot blocklist settings
+BOT_BLOCKLIST_POLL_SECONDS = 30
+ADMIN_API_KEY = os.environ.get('ADMIN_API_KEY')  # Admin endpoints are disabled when unset
+BOT_SCORE_THRESHOLD = float(os.environ.get('BOT_SCORE_THRESHOLD', '0.7'))  # Comments scoring at or above this are bots
 
 class VideoInfo(BaseModel):
     video_id: str
@@ -42,8 +156,10 @@ class VideoInfo(BaseModel):
     thumbnail_url: str
     view_count: str
     like_count: str
+    comment_count: str = '0'
 
 class Comment(BaseModel):
+    comment_id: Optional[str] = None
     author: str
     text: str
     author_channel_url: str
@@ -51,27 +167,137 @@ class Comment(BaseModel):
     published_at: str
     like_count: int
     is_bot: bool = False
+    bot_score: float = 0.0
+    bot_reasons: List[str] = []
+    parent_id: Optional[str] = None  # Thread a reply belongs to; None for top-level comments
 
 class FetchCommentsRequest(BaseModel):
     video_url: str
+    refresh: bool = False  # Pull only comments posted since the cached fetch
+    include_replies: bool = False  # Also read replies, so they can win too
+    max_comments: Optional[int] = Field(500, ge=1)  # None fetches every thread; use the stream endpoint for big videos
+
+class FetchGiveawayRequest(BaseModel):
+    video_urls: List[str] = []
+    playlist_url: Optional[str] = None
+    channel_url: Optional[str] = None  # Channel URL, @handle or UC... ID
+    max_videos: int = 20  # Most recent uploads taken from a playlist or channel
+    max_comments_per_video: Optional[int] = Field(500, ge=1)
+    include_replies: bool = False
+
+class FetchJobRequest(BaseModel):
+    video_url: str
+    include_replies: bool = False
+    max_comments: Optional[int] = Field(None, ge=1)  # None pages through every thread
+
+class FetchJob(BaseModel):
+    job_id: str
+    video_id: str
+    status: Literal['queued', 'running', 'done', 'failed']
+    include_replies: bool = False
+    max_comments: Optional[int] = None
+    video_info: Optional[VideoInfo] = None
+    queued_ahead: Optional[int] = None  # Jobs ahead of this one while it is queued
+    pages: int = 0
+    comments_fetched: int = 0
+    bots_detected: int = 0
+    cached: bool = False  # Answered from the comment cache without paging
+    session_id: Optional[str] = None  # Set once done; pass to pick-winners
+    error_status: Optional[int] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
 
 class FetchCommentsResponse(BaseModel):
     video_info: VideoInfo
     comments: List[Comment]
     total_comments: int
     bots_detected: int
+    cached: bool = False
+    session_id: Optional[str] = None  # Pass to pick-winners instead of re-uploading comments
 
 class PickWinnersRequest(BaseModel):
-    comments: List[Comment]
+    session_id: Optional[str] = None  # Draw from a server-side comment session
+    comments: List[Comment] = []
     exclude_duplicates: bool = True
     keyword_filter: Optional[str] = None
-    winner_count: int = 1
+    keyword_mode: Literal['any', 'all'] = 'any'  # Require any one keyword, or every keyword
+    keyword_whole_word: bool = False
+    winner_count: int = Field(1, ge=1)
     excluded_authors: List[str] = []  # Previously selected winners to exclude
+    near_duplicates: Literal['keep', 'exclude', 'collapse'] = 'keep'  # Copy-paste clusters across authors
+    client_seed: Optional[str] = None  # Optional entropy from the host, mixed into the draw
+
+class CommentPage(BaseModel):
+    video_id: str
+    comments: List[dict]  # Trimmed to the requested fields
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page; None on the last page
+    total_matches: Optional[int] = None  # Only counted for the first page
+
+class DrawReceipt(BaseModel):
+    draw_id: str
+    algorithm: str
+    pool_hash: str
+    pool_size: int
+    seed_commitment: str
+    seed: str
+    client_seed: Optional[str] = None
+    winner_indices: List[int]
 
 class PickWinnersResponse(BaseModel):
     winners: List[Comment]
     total_eligible: int
     total_filtered: int
+    draw: Optional[DrawReceipt] = None
+
+class VerifyDrawRequest(BaseModel):
+    comments: List[Comment] = []  # The uploaded comments, for draws not made from a session
+
+class VerifyDrawResponse(BaseModel):
+    draw_id: str
+    verified: bool
+    pool_hash_matches: bool
+    winners_match: bool
+    winner_ids: List[str]
+
+class QuotaStatus(BaseModel):
+    daily_budget: int
+    used: int
+    remaining: int
+    reserved: int
+    queue_depth: int
+    resets_at: str
+
+class BlocklistUpdateRequest(BaseModel):
+    add: List[str] = []
+    remove: List[str] = []
+
+class BlocklistStatus(BaseModel):
+    version: int
+    total_usernames: int
+
+COMMENT_FIELDS = tuple(Comment.model_fields)
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Validate a fields= projection such as 'author,text'; empty keeps every field"""
+    if not fields:
+        return COMMENT_FIELDS
+    requested = tuple(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+    unknown = [f for f in requested if f not in Comment.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown comment fields: {', '.join(unknown)}")
+    return requested or COMMENT_FIELDS
+
+def project_comments(comments: List[Comment], fields: Tuple[str, ...]) -> List[dict]:
+    if len(fields) == 1:
+        return [{fields[0]: getattr(c, fields[0])} for c in comments]
+    getter = attrgetter(*fields)
+    return [dict(zip(fields, getter(c))) for c in comments]
+
+def project_docs(docs: List[dict], fields: Tuple[str, ...]) -> List[dict]:
+    if fields == COMMENT_FIELDS:
+        return docs
+    return [{f: doc.get(f) for f in fields} for doc in docs]
 
 def extract_video_id(url: str) -> str:
     """Extract video ID from YouTube URL (supports Shorts)"""
@@ -94,9 +320,115 @@ def extract_video_id(url: str) -> str:
     
     raise ValueError("Invalid YouTube URL")
 
-def is_bot_comment(author: str, text: str) -> bool:
-    """Detect bot comments from blacklisted usernames"""
-    bot_usernames = {
+def extract_playlist_id(url: str) -> str:
+    match = re.search(r'[?&]list=([\w-]+)', url)
+    if match:
+        return match.group(1)
+    if re.match(r'^[\w-]{12,}$', url):
+        return url
+    raise ValueError("Invalid YouTube playlist URL")
+
+def extract_channel_ref(url: str) -> Tuple[str, str]:
+    """Return ('id', channel_id) or ('handle', @handle) for a channel URL"""
+    match = re.search(r'(?:youtube\.com\/channel\/)?(UC[\w-]{22})', url)
+    if match:
+        return 'id', match.group(1)
+    match = re.search(r'(?:youtube\.com\/)?(@[\w.-]+)', url)
+    if match:
+        return 'handle', match.group(1)
+    raise ValueError("Invalid YouTube channel URL")
+
+class Metrics:
+    """Process-local counters and histograms, exported in Prometheus text format.
+
+    Recording is a dict update keyed by the label values; nothing is
+    formatted until /api/metrics is scraped.
+    """
+
+    def __init__(self, definitions: dict):
+        self.definitions = definitions
+        self.counters: Dict[Tuple[str, tuple], float] = {}
+        self.histograms: Dict[Tuple[str, tuple], list] = {}  # bucket counts, then sum
+        self.gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(labels.items()))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        buckets = self.definitions[name][2]
+        key = (name, tuple(labels.items()))
+        state = self.histograms.get(key)
+        if state is None:
+            state = self.histograms[key] = [0] * (len(buckets) + 2)
+        state[bisect.bisect_left(buckets, value)] += 1
+        state[-1] += value
+
+    @contextmanager
+    def timed(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]):
+        self.gauges[name] = (help_text, read)
+
+    def render(self) -> str:
+        lines = []
+        by_name: Dict[str, list] = {}
+        for (name, labels), value in self.counters.items():
+            by_name.setdefault(name, []).append((labels, value))
+        for (name, labels), state in self.histograms.items():
+            by_name.setdefault(name, []).append((labels, state))
+        
+        for name in sorted(by_name):
+            kind, help_text, buckets = self.definitions[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in by_name[name]:
+                if kind == 'counter':
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(buckets) + ['+Inf'], value[:-1]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {value[-1]}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        
+        for name, (help_text, read) in sorted(self.gauges.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {read()}")
+        return '\n'.join(lines) + '\n'
+
+def format_labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+    escaped = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{key}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+metrics = Metrics(METRICS)
+
+class RequestStats:
+    """YouTube usage attributed to the request being served"""
+    __slots__ = ('youtube_calls', 'youtube_pages', 'quota_units')
+
+    def __init__(self):
+        self.youtube_calls = 0
+        self.youtube_pages = 0
+        self.quota_units = 0
+
+# Set per request by MetricsMiddleware; tasks started while serving it inherit it
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar('request_stats', default=None)
+
+# Seed for the bot blocklist store; the live list is kept in MongoDB
+DEFAULT_BOT_USERNAMES = frozenset({
         '@tylernoahanderson1997', '@Louis-Vincent-Myers', '@Randy.James.Harris',
         '@terrybrown1977', '@austinward23', '@JoshuaEthanCook',
         '@Jeffrey-Jose-Roberts', '@zacharyloganortiz1973', '@subho-v5s', '@Subscribergoat', '@Aryansenna', '@Brook-k6d',
@@ -182,317 +514,2413 @@ def is_bot_comment(author: str, text: str) -> bool:
 '@NovaSphereMedia-w2m', '@PeakWaveStudio-v9j', '@TrainerTactics-u3n', '@BattleFrontierHQ', '@EliteFourEnergy', '@janeljames-d6l', '@Flutchin', 
 '@PokéPullsCentral-k9q', '@SkyElementalBox', '@PokeDudeASMR', '@Landy-w1p', '@LingChingPingDingRing', '@Leanard-p9j', '@chihaein', '@moonStatic8193', 
 '@PixelDrift1232', '@saiisthebest2773', '@chivo739', '@red0332', '@JaceYap', '@corrinap', '@Monster_zaczac', '@WavyWavy2', '@xanderbaby', 
-'@NicolaClarke-t4p', '@MarcosChavez-f4b', '@ChristianLeal-i1g', '@Sahithi-f5y', '@PrimeCatcher', '@ArchExcel', '@oscarramos111', '@Kutey-tku', 
+'@NicolaClarke-t4p', '@MarcosChavez-f4b', '@ChristianLeal-i1g', '@Sahithi-f5y', '@PrimeCatcher', '@ArchExcel', '@oscarramos111', '@Kutey-tku',
+})
 
+class BotBlocklist:
+    """Immutable snapshot of the bot blocklist at one store version"""
 
+    def __init__(self, version: int, usernames: frozenset):
+        self.version = version
+        self.usernames = usernames
 
+# Swapped for a new snapshot whenever the store version changes
+bot_blocklist = BotBlocklist(0, DEFAULT_BOT_USERNAMES)
 
+# Heuristic signal weights; a comment's bot score is the capped sum of its signals
+BOT_SIGNAL_WEIGHTS = {
+    'blocklist': 1.0,
+    'phone_number': 0.45,
+    'promo_phrase': 0.4,
+    'link': 0.3,
+    'repeated_text': 0.3,
+    'comment_burst': 0.3,
+    'handle_suffix': 0.15,
+}
+BOT_BURST_COUNT = 3       # comments by one author ...
+BOT_BURST_WINDOW = 120    # ... within this many seconds
+REPEATED_TEXT_MIN_LENGTH = 20  # shorter texts ("congratulations!") are what real viewers all write
 
+# Auto-generated handles end in a short random suffix (@Name-k6d) or a long digit run
+HANDLE_SUFFIX_PATTERN = re.compile(r'(?:-[a-z0-9]{3,6}|[._]?\d{4,})$')
+# Text signals run on casefolded text; cheap substring checks gate the regexes
+LINK_MARKERS = ('http://', 'https://', 'www.', 't.me/', 'wa.me/', 'bit.ly/')
+DIGIT_PATTERN = re.compile(r'\d')
+PHONE_MIN_DIGITS = 7
+PHONE_PATTERN = re.compile(r'\+?\d[\d\s().-]{8,}\d')
+# Each promo phrase has one of the markers inside a single word, so texts without any skip the regex
+PROMO_MARKERS = ('whats', 'telegram', 'selected', 'chosen', 'claim', 'dm', 'message', 'text', 'contact', 'check')
+PROMO_FREE_WORDS_MAX = 200_000  # Words remembered as holding no marker; most comments reuse a small vocabulary
+PROMO_PATTERN = re.compile(
+    r'whats\s?app|telegram|you\s+(?:have\s+been|were)\s+(?:selected|chosen)|'
+    r'claim\s+(?:your|the)\s+(?:prize|reward)|(?:dm|message|text|contact)\s+me|'
+    r'(?:send|drop)\s+(?:a\s+)?(?:message|text)|check\s+my\s+(?:channel|profile|bio)'
+)
+NON_WORD_PATTERN = re.compile(r'\W+')
 
+# Casefolded words seen without a promo marker, so a set check clears most texts at once
+promo_free_words: set = set()
 
+def has_promo_marker(words: List[str]) -> bool:
+    if promo_free_words.issuperset(words):
+        return False
+    found = False
+    for word in words:
+        if word in promo_free_words:
+            continue
+        if any(marker in word for marker in PROMO_MARKERS):
+            found = True
+        elif len(promo_free_words) < PROMO_FREE_WORDS_MAX:
+            promo_free_words.add(word)
+    return found
 
+def text_bot_signals(text: str) -> Tuple[Tuple[str, ...], str]:
+    """Reason codes for one distinct text, and its normalized form for spotting repeats"""
+    folded = text.casefold()
+    words = folded.split()
+    letters = ''.join(words)
+    reasons = ()
+    if letters.isalpha():
+        # Nothing but letters: no link or phone number, and the words are already normalized
+        normalized = ' '.join(words)
+    else:
+        if ('/' in folded or 'www.' in folded) and any(marker in folded for marker in LINK_MARKERS):
+            reasons += ('link',)
+        if (DIGIT_PATTERN.search(folded) and len(DIGIT_PATTERN.findall(folded)) >= PHONE_MIN_DIGITS
+                and PHONE_PATTERN.search(folded)):
+            reasons += ('phone_number',)
+        normalized = ' '.join(words) if letters.isalnum() else NON_WORD_PATTERN.sub(' ', folded).strip()
+    if has_promo_marker(words) and PROMO_PATTERN.search(folded):
+        reasons += ('promo_phrase',)
+    return reasons, normalized
 
-}
+def author_bot_reasons(author: str, blocklist: frozenset, bursting_authors: set) -> Tuple[str, ...]:
+    reasons = ()
+    if author in blocklist:
+        reasons += ('blocklist',)
+    # A trailing digit run is the pattern's second branch; only dashed handles need the regex
+    if author[-4:].isdigit() or ('-' in author and HANDLE_SUFFIX_PATTERN.search(author)):
+        reasons += ('handle_suffix',)
+    if author in bursting_authors:
+        reasons += ('comment_burst',)
+    return reasons
+
+def published_timestamp(published_at: str) -> float:
+    return datetime.fromisoformat(published_at.replace('Z', '+00:00')).timestamp()
+
+def find_bursting_authors(authors: List[str], published_ats: List[str]) -> set:
+    """Authors with BOT_BURST_COUNT comments inside any BOT_BURST_WINDOW"""
+    candidates = {author for author, count in Counter(authors).items() if count >= BOT_BURST_COUNT}
+    if not candidates:
+        return set()
+    published_by_author: Dict[str, List[str]] = {}
+    for author, published_at in zip(authors, published_ats):
+        if author in candidates:
+            published_by_author.setdefault(author, []).append(published_at)
+    
+    bursting = set()
+    for author, published in published_by_author.items():
+        if len(published) < BOT_BURST_COUNT:
+            continue
+        times = sorted(published_timestamp(p) for p in published)
+        for i in range(len(times) - BOT_BURST_COUNT + 1):
+            if times[i + BOT_BURST_COUNT - 1] - times[i] <= BOT_BURST_WINDOW:
+                bursting.add(author)
+                break
+    return bursting
+
+def score_comment_batch(authors: List[str], texts: List[str],
+                        published_ats: List[str]) -> List[Tuple[float, Tuple[str, ...]]]:
+    """Score a whole page of comments for bot likelihood in one pass.
+
+    Per-comment signals (blocklist, handle suffix, links, phone numbers,
+    promo phrasing) are combined with page-level ones: the same text posted
+    by several authors, and one author posting in a tight burst. Returns a
+    (score, reason codes) pair per comment. Signals are computed once per
+    distinct author and text, which copy-paste spam makes very repetitive.
+    """
+    blocklist = bot_blocklist.usernames
+    bursting_authors = find_bursting_authors(authors, published_ats)
+    
+    text_signals: Dict[str, Tuple[Tuple[str, ...], str]] = {}
+    authors_by_normalized: Dict[str, set] = {}
+    for author, text in zip(authors, texts):
+        signals = text_signals.get(text)
+        if signals is None:
+            signals = text_signals[text] = text_bot_signals(text)
+        normalized = signals[1]
+        if len(normalized) >= REPEATED_TEXT_MIN_LENGTH:
+            normalized_authors = authors_by_normalized.get(normalized)
+            if normalized_authors is None:
+                authors_by_normalized[normalized] = {author}
+            else:
+                normalized_authors.add(author)
+    
+    text_reasons = {}
+    for text, (reasons, normalized) in text_signals.items():
+        normalized_authors = authors_by_normalized.get(normalized)
+        if normalized_authors is not None and len(normalized_authors) > 1:
+            reasons += ('repeated_text',)
+        text_reasons[text] = reasons
+    
+    clean = (0.0, ())
+    author_reasons: Dict[str, Tuple[str, ...]] = {}
+    scored: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], Tuple[float, Tuple[str, ...]]] = {}
+    results = []
+    for author, text in zip(authors, texts):
+        by_author = author_reasons.get(author)
+        if by_author is None:
+            by_author = author_reasons[author] = author_bot_reasons(author, blocklist, bursting_authors)
+        by_text = text_reasons[text]
+        if not by_author and not by_text:
+            results.append(clean)
+            continue
+        key = (by_author, by_text)
+        result = scored.get(key)
+        if result is None:
+            reasons = by_author + by_text
+            result = scored[key] = (min(1.0, sum(BOT_SIGNAL_WEIGHTS[r] for r in reasons)), reasons)
+        results.append(result)
     
-    return author in bot_usernames
+    return results
 
-def check_rate_limit(request: Request):
-    ip = request.client.host
-    now = time.time()
+async def seed_bot_blocklist():
+    """Populate an empty blocklist store from DEFAULT_BOT_USERNAMES"""
+    result = await db.bot_blocklist_version.update_one(
+        {'_id': 'current'},
+        {'$setOnInsert': {'version': 1}},
+        upsert=True
+    )
+    if result.upserted_id is not None:
+        await db.bot_blocklist.insert_many(
+            [{'username': username} for username in DEFAULT_BOT_USERNAMES],
+            ordered=False
+        )
+
+async def reload_bot_blocklist(force: bool = False):
+    global bot_blocklist
+    version_doc = await db.bot_blocklist_version.find_one({'_id': 'current'})
+    version = version_doc['version'] if version_doc else 0
+    if version == bot_blocklist.version and not force:
+        return
+    
+    usernames = frozenset([doc['username'] async for doc in db.bot_blocklist.find({}, {'_id': 0, 'username': 1})])
+    bot_blocklist = BotBlocklist(version, usernames)
+    logging.info(f"Loaded bot blocklist version {version} ({len(usernames)} usernames)")
 
-    if ip not in ip_requests:
-        ip_requests[ip] = []
+async def watch_bot_blocklist():
+    """Pick up blocklist edits made by other workers"""
+    while True:
+        await asyncio.sleep(BOT_BLOCKLIST_POLL_SECONDS)
+        try:
+            await reload_bot_blocklist()
+        except Exception as e:
+            logging.error(f"Error reloading bot blocklist: {str(e)}")
 
-    ip_requests[ip] = [
-        t for t in ip_requests[ip]
-        if now - t < RATE_LIMIT_WINDOW
-    ]
+class CommentPool:
+    """Column-per-field store for a comment set that is filtered and drawn from.
+
+    Flags and numbers sit in typed arrays, and author, channel and avatar
+    strings are interned so a commenter's repeated comments share one copy.
+    Comment models are only built for the entries a response returns.
+    """
+
+    def __init__(self):
+        self.comment_ids: List[Optional[str]] = []
+        self.authors: List[str] = []
+        self.texts: List[str] = []
+        self.author_channel_urls: List[str] = []
+        self.author_profile_image_urls: List[str] = []
+        self.published_ats: List[str] = []
+        self.like_counts = array('q')
+        self.is_bots = array('b')
+        self.bot_scores = array('d')
+        self.bot_reasons: List[Tuple[str, ...]] = []
+        self.parent_ids: List[Optional[str]] = []
+        self._reason_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.authors)
+
+    def append(self, doc: dict):
+        """Add one comment, given as a stored document or a model's field dict"""
+        self.comment_ids.append(doc.get('comment_id'))
+        self.authors.append(sys.intern(doc['author']))
+        self.texts.append(doc['text'])
+        self.author_channel_urls.append(sys.intern(doc['author_channel_url']))
+        self.author_profile_image_urls.append(sys.intern(doc['author_profile_image_url']))
+        self.published_ats.append(doc['published_at'])
+        self.like_counts.append(doc['like_count'])
+        self.is_bots.append(doc.get('is_bot', False))
+        self.bot_scores.append(doc.get('bot_score', 0.0))
+        reasons = tuple(doc.get('bot_reasons', ()))
+        self.bot_reasons.append(self._reason_tuples.setdefault(reasons, reasons))
+        self.parent_ids.append(doc.get('parent_id'))
+
+    @classmethod
+    def from_comments(cls, comments: Iterable[Comment]) -> 'CommentPool':
+        pool = cls()
+        for comment in comments:
+            pool.append(comment.__dict__)
+        return pool
+
+    def entry_key(self, i: int) -> str:
+        return comment_entry_key(self.comment_ids[i], self.authors[i], self.published_ats[i], self.texts[i])
+
+    def comment(self, i: int) -> Comment:
+        # Every column was validated when the comment was fetched or uploaded
+        return Comment.model_construct(
+            comment_id=self.comment_ids[i],
+            author=self.authors[i],
+            text=self.texts[i],
+            author_channel_url=self.author_channel_urls[i],
+            author_profile_image_url=self.author_profile_image_urls[i],
+            published_at=self.published_ats[i],
+            like_count=self.like_counts[i],
+            is_bot=bool(self.is_bots[i]),
+            bot_score=self.bot_scores[i],
+            bot_reasons=list(self.bot_reasons[i]),
+            parent_id=self.parent_ids[i]
+        )
+
+def comment_entry_key(comment_id: Optional[str], author: str, published_at: str, text: str) -> str:
+    """Identify a comment within a draw pool"""
+    if comment_id:
+        return comment_id
+    # Uploaded comments may lack an ID; fall back to what identifies them
+    return hashlib.sha256(f"{author}\x1f{published_at}\x1f{text}".encode()).hexdigest()
+
+# 🧬 Near-duplicate detection settings
+NEAR_DUPLICATE_MIN_LENGTH = 30   # shorter texts ("me please!") are too generic to cluster
+NEAR_DUPLICATE_SIMILARITY = 0.7  # estimated Jaccard similarity of character shingles
+MINHASH_SHINGLE_SIZE = 5
+MINHASH_BANDS = 8
+MINHASH_ROWS = 4
+MINHASH_CHUNK_SHINGLES = 200_000
+NEAR_DUPLICATE_CACHE_SIZE = 32  # session pools whose filtered positions are kept for re-rolls and verifies
+
+_minhash_rng = np.random.default_rng(0x5EED)
+MINHASH_A = _minhash_rng.integers(1, 2**63, size=MINHASH_BANDS * MINHASH_ROWS, dtype=np.uint64) | np.uint64(1)
+MINHASH_B = _minhash_rng.integers(0, 2**63, size=MINHASH_BANDS * MINHASH_ROWS, dtype=np.uint64)
+MINHASH_BAND_MIX = _minhash_rng.integers(1, 2**63, size=MINHASH_ROWS, dtype=np.uint64) | np.uint64(1)
+
+def minhash_signatures(texts: List[str]) -> np.ndarray:
+    """MinHash signatures of character shingles, one row per text.
+
+    All texts are hashed together: the shingles of every text are computed
+    from one concatenated code-point array and reduced per text with
+    minimum.reduceat, so there is no per-shingle Python work.
+    """
+    k = MINHASH_SHINGLE_SIZE
+    codes = [np.frombuffer(t.encode('utf-32-le'), dtype=np.uint32) for t in texts]
+    lengths = np.array([len(c) for c in codes], dtype=np.int64)
+    flat = np.concatenate(codes).astype(np.uint64)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    
+    window_count = len(flat) - k + 1
+    shingles = np.zeros(window_count, dtype=np.uint64)
+    for j in range(k):
+        shingles = shingles * np.uint64(1000003) + flat[j:j + window_count]
+    
+    # Keep only windows that lie inside a single text
+    doc_of_window = np.repeat(np.arange(len(texts)), lengths)[:window_count]
+    valid = np.arange(window_count) - starts[doc_of_window] <= lengths[doc_of_window] - k
+    shingles = shingles[valid]
+    doc_of_shingle = doc_of_window[valid]
+    offsets = np.searchsorted(doc_of_shingle, np.arange(len(texts)))
+    
+    # Permutations run along rows so reduceat works on contiguous memory
+    signatures = np.empty((len(MINHASH_A), len(texts)), dtype=np.uint32)
+    doc = 0
+    while doc < len(texts):
+        end = int(np.searchsorted(offsets, offsets[doc] + MINHASH_CHUNK_SHINGLES, side='right'))
+        end = max(end, doc + 1)
+        lo = offsets[doc]
+        hi = offsets[end] if end < len(texts) else len(shingles)
+        permuted = ((MINHASH_A[:, None] * shingles[None, lo:hi] + MINHASH_B[:, None]) >> np.uint64(32)).astype(np.uint32)
+        signatures[:, doc:end] = np.minimum.reduceat(permuted, offsets[doc:end] - lo, axis=1)
+        doc = end
+    
+    return np.ascontiguousarray(signatures.T)
+
+def find_near_duplicate_clusters(texts: List[str]) -> List[int]:
+    """Group near-identical texts with MinHash + LSH banding.
+
+    Returns a cluster label per text: the index of the cluster's first
+    member, or -1 for texts too short to compare. Only texts that share an
+    LSH bucket are compared, so the cost grows roughly linearly with the
+    number of texts instead of pairwise.
+    """
+    labels = [-1] * len(texts)
+    normalized = [NON_WORD_PATTERN.sub(' ', t.casefold()).strip() for t in texts]
+    candidates = [i for i, t in enumerate(normalized) if len(t) >= NEAR_DUPLICATE_MIN_LENGTH]
+    if not candidates:
+        return labels
+    
+    signatures = minhash_signatures([normalized[i] for i in candidates])
+    parent = list(range(len(candidates)))
+    
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    for band in range(MINHASH_BANDS):
+        rows = signatures[:, band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS].astype(np.uint64)
+        keys = (rows * MINHASH_BAND_MIX).sum(axis=1)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        
+        # Pair every bucket member with the bucket's first member and confirm
+        # the LSH candidate with the full signature before merging
+        is_start = np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1]))
+        first = order[np.maximum.accumulate(np.where(is_start, np.arange(len(order)), 0))]
+        members = order[~is_start]
+        leaders = first[~is_start]
+        similarity = (signatures[members] == signatures[leaders]).mean(axis=1)
+        confirmed = similarity >= NEAR_DUPLICATE_SIMILARITY
+        
+        for member, leader in zip(members[confirmed].tolist(), leaders[confirmed].tolist()):
+            member_root, leader_root = find(member), find(leader)
+            if member_root != leader_root:
+                parent[member_root] = leader_root
+    
+    roots = [find(i) for i in range(len(candidates))]
+    for i, root in zip(candidates, roots):
+        labels[i] = candidates[root]
+    
+    return labels
+
+def filter_near_duplicates(pool: CommentPool, indices: List[int], mode: str) -> List[int]:
+    """Drop ('exclude') or reduce to their earliest comment ('collapse')
+    clusters of near-identical comments posted by more than one author.
+
+    Works on positions in the pool and returns the positions that remain.
+    """
+    labels = find_near_duplicate_clusters([pool.texts[i] for i in indices])
+    
+    cluster_authors: Dict[int, set] = {}
+    for i, label in zip(indices, labels):
+        if label >= 0:
+            cluster_authors.setdefault(label, set()).add(pool.authors[i])
+    spam_clusters = {label for label, authors in cluster_authors.items() if len(authors) > 1}
+    
+    if mode == 'exclude':
+        return [i for i, label in zip(indices, labels) if label not in spam_clusters]
+    
+    earliest: Dict[int, int] = {}
+    for i, label in zip(indices, labels):
+        if label in spam_clusters:
+            if label not in earliest or pool.published_ats[i] < pool.published_ats[earliest[label]]:
+                earliest[label] = i
+    kept = set(earliest.values())
+    return [i for i, label in zip(indices, labels) if label not in spam_clusters or i in kept]
+
+# Positions dropped by the near-duplicate filter, keyed by (session_id, mode).
+# A session is pinned to one cache generation, so its pool never changes.
+near_duplicate_cache: LRUCache = LRUCache(maxsize=NEAR_DUPLICATE_CACHE_SIZE)
+
+async def near_duplicate_removals(pool: CommentPool, request: PickWinnersRequest) -> Sequence[int]:
+    """Positions filter_near_duplicates drops from the pool's non-bot comments.
+
+    Clustering a big pool takes seconds of CPU, so it runs in a worker
+    thread rather than stalling every other request on the event loop.
+    Session results are cached so re-rolls of the same session skip it.
+    """
+    key = (request.session_id, request.near_duplicates) if request.session_id else None
+    if key is not None and key in near_duplicate_cache:
+        return near_duplicate_cache[key]
+    
+    candidates = [i for i in range(len(pool)) if not pool.is_bots[i]]
+    with metrics.timed('stage_duration_seconds', stage='near_duplicates'):
+        kept = set(await asyncio.to_thread(filter_near_duplicates, pool, candidates, request.near_duplicates))
+    removed = array('l', (i for i in candidates if i not in kept))
+    if key is not None:
+        near_duplicate_cache[key] = removed
+    return removed
+
+class KeywordMatcher:
+    """Match a set of keywords against comment text in one pass.
+
+    Keywords are casefolded and compiled into a single trie-shaped regex, so
+    each text is scanned once however many keywords there are (the same
+    idea as an Aho-Corasick automaton, run by the C regex engine). In
+    match-all mode the scan also reports keywords that are prefixes of a
+    longer keyword matched at the same position.
+    """
+
+    def __init__(self, keywords: List[str], whole_word: bool = False, match_all: bool = False):
+        self.keywords = frozenset(k.casefold() for k in keywords)
+        self.match_all = match_all
+        
+        trie: dict = {}
+        for keyword in self.keywords:
+            node = trie
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[''] = {}
+        
+        core = self._trie_pattern(trie)
+        before, after = (r'(?<!\w)', r'(?!\w)') if whole_word else ('', '')
+        if match_all:
+            # Zero-width lookahead so matches may overlap
+            self.pattern = re.compile(f'{before}(?=({core}){after})')
+        else:
+            self.pattern = re.compile(f'{before}(?:{core}){after}')
+        
+        # Keywords implied by a longer keyword that starts with them
+        self.prefixes: Dict[str, frozenset] = {}
+        if match_all:
+            word_char = re.compile(r'\w')
+            for keyword in self.keywords:
+                node, found = trie, set()
+                for i, ch in enumerate(keyword[:-1]):
+                    node = node[ch]
+                    # In whole-word mode the prefix must itself end at a word boundary
+                    if '' in node and not (whole_word and word_char.match(keyword, i + 1)):
+                        found.add(keyword[:i + 1])
+                self.prefixes[keyword] = frozenset(found)
+
+    @classmethod
+    def _trie_pattern(cls, node: dict) -> str:
+        alternatives = [re.escape(ch) + cls._trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ''
+        group = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        if '' in node:
+            return f'(?:{group})?'
+        return group
+
+    def matches(self, text: str) -> bool:
+        folded = text.casefold()
+        if not self.match_all:
+            return self.pattern.search(folded) is not None
+        
+        remaining = set(self.keywords)
+        for match in self.pattern.finditer(folded):
+            keyword = match.group(1)
+            remaining.discard(keyword)
+            remaining -= self.prefixes[keyword]
+            if not remaining:
+                return True
+        return False
+
+@lru_cache(maxsize=128)
+def get_keyword_matcher(keyword_filter: str, whole_word: bool, match_all: bool) -> Optional[KeywordMatcher]:
+    """Compiled matcher for a comma-separated keyword filter, or None if it has no keywords"""
+    keywords = [k.strip() for k in keyword_filter.split(',') if k.strip()]
+    if not keywords:
+        return None
+    return KeywordMatcher(keywords, whole_word=whole_word, match_all=match_all)
+
+class InMemoryRateLimitBackend:
+    """Per-worker window counters with LRU and TTL eviction"""
+
+    def __init__(self, max_keys: int, ttl: int):
+        self.counters = TTLCache(maxsize=max_keys, ttl=ttl)
+
+    async def hit(self, key: str, window_index: int) -> Tuple[int, int]:
+        current_key = (key, window_index)
+        current = self.counters.get(current_key, 0) + 1
+        self.counters[current_key] = current
+        return self.counters.get((key, window_index - 1), 0), current
+
+class MongoRateLimitBackend:
+    """Window counters in MongoDB, shared by every worker"""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+
+    async def hit(self, key: str, window_index: int) -> Tuple[int, int]:
+        current = await db.rate_limits.find_one_and_update(
+            {'_id': f'{key}:{window_index}'},
+            {
+                '$inc': {'count': 1},
+                '$setOnInsert': {'expires_at': datetime.now(timezone.utc) + timedelta(seconds=self.ttl)}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        previous = await db.rate_limits.find_one({'_id': f'{key}:{window_index - 1}'})
+        return (previous or {}).get('count', 0), current['count']
+
+class RateLimiter:
+    """Sliding-window-counter rate limiter with a budget per route.
+
+    Each client keeps a counter for the current and previous fixed window;
+    the previous count is weighted by how much of it still overlaps the
+    sliding window. That is O(1) per request, unlike a timestamp log.
+    """
+
+    def __init__(self, backend, limits: Dict[str, Tuple[int, int]]):
+        self.backend = backend
+        self.limits = limits
 
-    if len(ip_requests[ip]) >= RATE_LIMIT:
+    async def allow(self, route: str, client_id: str) -> bool:
+        limit, window = self.limits[route]
+        now = time.time()
+        window_index = int(now // window)
+        previous, current = await self.backend.hit(f'{route}:{client_id}', window_index)
+        overlap = 1 - (now % window) / window
+        return previous * overlap + current <= limit
+
+def create_rate_limiter() -> RateLimiter:
+    ttl = 2 * max(window for _, window in RATE_LIMITS.values())
+    if RATE_LIMIT_BACKEND == 'mongo':
+        backend = MongoRateLimitBackend(ttl)
+    else:
+        backend = InMemoryRateLimitBackend(RATE_LIMIT_MAX_KEYS, ttl)
+    return RateLimiter(backend, RATE_LIMITS)
+
+rate_limiter = create_rate_limiter()
+
+async def check_rate_limit(request: Request, route: str):
+    if not await rate_limiter.allow(route, request.client.host):
+        metrics.inc('rate_limit_rejections_total', route=route)
         raise HTTPException(
             status_code=429,
             detail="Too many requests. Please wait a minute and try again."
         )
 
-    ip_requests[ip].append(now)
+class YouTubeAPIError(Exception):
+    """Error response returned by the YouTube Data API"""
 
-@api_router.post("/youtube/fetch-comments", response_model=FetchCommentsResponse)
-async def fetch_comments(request: FetchCommentsRequest, req: Request):
-    check_rate_limit(req)
+    def __init__(self, status: int, reason: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
 
-    try:
-        video_id = extract_video_id(request.video_url)
-        youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY, cache_discovery=False)
-        
-        video_response = youtube.videos().list(
-            part='snippet,statistics',
-            id=video_id
-        ).execute()
-        
-        if not video_response.get('items'):
-            raise HTTPException(status_code=404, detail="Video not found")
-        
-        video_data = video_response['items'][0]
-        video_info = VideoInfo(
-            video_id=video_id,
-            title=video_data['snippet']['title'],
-            channel_title=video_data['snippet']['channelTitle'],
-            thumbnail_url=video_data['snippet']['thumbnails']['high']['url'],
-            view_count=video_data['statistics'].get('viewCount', '0'),
-            like_count=video_data['statistics'].get('likeCount', '0')
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "YouTubeAPIError":
+        try:
+            error = response.json().get('error', {})
+        except ValueError:
+            error = {}
+        errors = error.get('errors') or [{}]
+        return cls(
+            status=response.status_code,
+            reason=errors[0].get('reason', ''),
+            message=error.get('message') or response.text
+        )
+
+class QuotaScheduler:
+    """Tracks YouTube quota spend against the daily budget and admits fetches.
+
+    Every API call is recorded as it is made; the day's total lives in
+    MongoDB so all workers see the same spend. Fetches reserve their
+    estimated page cost up front. While plenty of budget is left they run
+    straight away. Once less than QUOTA_TIGHT_FRACTION remains they queue,
+    and at most QUOTA_TIGHT_CONCURRENCY run at once: cheaper fetches
+    (cached refreshes, capped fetches) go first and clients take turns
+    within the same cost class. Fetches that cannot fit in what is left
+    are rejected outright.
+    """
+
+    def __init__(self, daily_budget: int):
+        self.daily_budget = daily_budget
+        self.day = self.current_day()
+        self.used = 0
+        self.reserved = 0
+        self.running = 0
+        self.served: Dict[str, int] = {}
+        self.waiters: list = []
+        self.sequence = itertools.count()
+
+    @staticmethod
+    def current_day() -> str:
+        return datetime.now(YOUTUBE_QUOTA_TIMEZONE).date().isoformat()
+
+    def _roll_day(self):
+        day = self.current_day()
+        if day != self.day:
+            self.day, self.used, self.served = day, 0, {}
+
+    @property
+    def remaining(self) -> int:
+        self._roll_day()
+        return max(0, self.daily_budget - self.used)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for *_, future in self.waiters if not future.done())
+
+    def resets_at(self) -> datetime:
+        tomorrow = datetime.now(YOUTUBE_QUOTA_TIMEZONE).date() + timedelta(days=1)
+        return datetime.combine(tomorrow, datetime.min.time(), YOUTUBE_QUOTA_TIMEZONE)
+
+    async def load(self):
+        doc = await db.youtube_quota.find_one({'_id': self.current_day()})
+        self.used = max(self.used, doc['used'] if doc else 0)
+
+    async def record(self, units: int):
+        self._roll_day()
+        self.used += units
+        doc = await db.youtube_quota.find_one_and_update(
+            {'_id': self.day},
+            {'$inc': {'used': units}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.used = max(self.used, doc['used'])
+
+    def mark_exhausted(self):
+        """The API reported quotaExceeded, so nothing is left until the reset"""
+        self._roll_day()
+        self.used = self.daily_budget
+
+    def _tight(self) -> bool:
+        return self.remaining - self.reserved < self.daily_budget * QUOTA_TIGHT_FRACTION
+
+    def check(self, units: int):
+        if units > self.remaining - self.reserved:
+            metrics.inc('quota_rejections_total')
+            raise HTTPException(
+                status_code=429,
+                detail="YouTube API quota is nearly used up for today. Please try again later."
+            )
+
+    def _dispatch(self):
+        while self.waiters and self.running < QUOTA_TIGHT_CONCURRENCY:
+            *_, future = heapq.heappop(self.waiters)
+            if not future.done():
+                future.set_result(None)
+                self.running += 1
+
+    async def _wait_turn(self, client_id: str, units: int):
+        future = asyncio.get_running_loop().create_future()
+        # Cheaper fetches first, then clients that have been served least
+        cost_class = math.ceil(math.log2(max(units, 1)))
+        heapq.heappush(self.waiters, (cost_class, self.served.get(client_id, 0), next(self.sequence), units, future))
+        self._dispatch()
+        
+        try:
+            await asyncio.wait_for(asyncio.shield(future), QUOTA_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            if future.done():  # admitted just as the timeout fired
+                return
+            future.cancel()
+            raise HTTPException(
+                status_code=429,
+                detail="Too many fetches are queued for YouTube quota. Please try again shortly."
+            )
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.running -= 1
+                self._dispatch()
+            else:
+                future.cancel()
+            raise
+
+    @asynccontextmanager
+    async def reserve(self, client_id: str, units: int):
+        self.check(units)
+        if self._tight() or self.queue_depth:
+            await self._wait_turn(client_id, units)
+        else:
+            self.running += 1
+        
+        try:
+            self.check(units)
+            self.served[client_id] = self.served.get(client_id, 0) + 1
+            self.reserved += units
+            try:
+                yield
+            finally:
+                self.reserved -= units
+        finally:
+            self.running -= 1
+            self._dispatch()
+
+quota_scheduler = QuotaScheduler(YOUTUBE_DAILY_QUOTA)
+metrics.gauge('youtube_quota_used_units', "YouTube quota units used today", lambda: quota_scheduler.daily_budget - quota_scheduler.remaining)
+metrics.gauge('youtube_quota_remaining_units', "YouTube quota units left today", lambda: quota_scheduler.remaining)
+metrics.gauge('youtube_quota_reserved_units', "Quota units reserved by running fetches", lambda: quota_scheduler.reserved)
+metrics.gauge('youtube_quota_queue_depth', "Fetches waiting for quota", lambda: quota_scheduler.queue_depth)
+
+def estimate_page_units(video_info: VideoInfo, max_comments: Optional[int]) -> int:
+    """Quota units needed to page through a video's comment threads"""
+    threads = int(video_info.comment_count or 0)
+    if max_comments is not None:
+        threads = min(threads, max_comments)
+    return max(1, math.ceil(threads / 100)) * YOUTUBE_QUOTA_COSTS['commentThreads']
+
+class YouTubeClient:
+    """Async client for the YouTube Data API v3 REST endpoints.
+
+    Requests go through a single keep-alive connection pool, so paging through
+    comment threads reuses the same TLS connection and every page round-trip
+    yields to the event loop instead of blocking it.
+    """
+
+    def __init__(self, api_key: str, base_url: str = YOUTUBE_API_BASE_URL,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={'X-Goog-Api-Key': api_key},
+            timeout=YOUTUBE_API_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=YOUTUBE_MAX_CONNECTIONS,
+                max_keepalive_connections=YOUTUBE_MAX_CONNECTIONS
+            ),
+            transport=transport
         )
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def _get(self, resource: str, etag: Optional[str] = None, **params) -> Optional[dict]:
+        """GET a resource; with an etag, returns None if it has not changed since"""
+        if quota_scheduler.remaining <= 0:
+            raise YouTubeAPIError(403, 'quotaExceeded', "Daily quota budget used up")
         
-        comments = []
-        next_page_token = None
+        params = {k: v for k, v in params.items() if v is not None}
+        headers = {'If-None-Match': etag} if etag else None
+        with metrics.timed('youtube_request_duration_seconds', resource=resource):
+            response = await self.http.get(f'/{resource}', params=params, headers=headers)
+        # Failed and not-modified calls are charged too
+        units = YOUTUBE_QUOTA_COSTS[resource]
+        await quota_scheduler.record(units)
+        if response.status_code == 304:
+            outcome = 'not_modified'
+        else:
+            outcome = 'error' if response.status_code >= 400 else 'ok'
+        metrics.inc('youtube_api_calls_total', resource=resource, outcome=outcome)
+        metrics.inc('youtube_quota_units_total', units, resource=resource)
+        stats = request_stats.get()
+        if stats is not None:
+            stats.youtube_calls += 1
+            stats.quota_units += units
+            if resource in ('commentThreads', 'comments'):
+                stats.youtube_pages += 1
+        
+        if response.status_code >= 400:
+            error = YouTubeAPIError.from_response(response)
+            if error.reason == 'quotaExceeded':
+                quota_scheduler.mark_exhausted()
+            raise error
+        if response.status_code == 304:
+            return None
+        return response.json()
+
+    async def list_videos(self, **params) -> Optional[dict]:
+        return await self._get('videos', **params)
+
+    async def list_comment_threads(self, **params) -> Optional[dict]:
+        return await self._get('commentThreads', **params)
+
+    async def list_comments(self, **params) -> dict:
+        return await self._get('comments', **params)
+
+    async def list_channels(self, **params) -> dict:
+        return await self._get('channels', **params)
+
+    async def list_playlist_items(self, **params) -> dict:
+        return await self._get('playlistItems', **params)
+
+# Shared by every request in this worker; created on first use so the
+# connection pool is bound to the running event loop.
+youtube_client: Optional[YouTubeClient] = None
+
+def get_youtube_client() -> YouTubeClient:
+    global youtube_client
+    if youtube_client is None:
+        youtube_client = YouTubeClient(YOUTUBE_API_KEY)
+    return youtube_client
+
+class ETagEntry:
+    __slots__ = ('etag', 'value', 'checked_at')
+
+    def __init__(self, etag: str, value, checked_at: float):
+        self.etag = etag
+        self.value = value
+        self.checked_at = checked_at
+
+class ETagCache:
+    """Parsed YouTube responses with the ETag each was served with.
+
+    The most recently used entries stay in memory, already parsed. Every
+    entry is also stored in MongoDB, so other workers, and this one after
+    a restart, can still revalidate instead of downloading the body again.
+    """
+
+    def __init__(self, max_entries: int):
+        self.entries = LRUCache(maxsize=max_entries)
+
+    async def get(self, key: str, decode: Callable[[dict], object]) -> Optional[ETagEntry]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            metrics.inc('etag_cache_lookups_total', result='memory')
+            return entry
         
-        while len(comments) < 500:
-            comment_response = youtube.commentThreads().list(
+        doc = await db.youtube_etags.find_one({'key': key})
+        if doc is None:
+            metrics.inc('etag_cache_lookups_total', result='miss')
+            return None
+        metrics.inc('etag_cache_lookups_total', result='store')
+        entry = self.entries[key] = ETagEntry(doc['etag'], decode(doc['value']), doc['checked_at'])
+        return entry
+
+    async def put(self, key: str, etag: Optional[str], value, encoded: dict):
+        if not etag:
+            return
+        now = time.time()
+        self.entries[key] = ETagEntry(etag, value, now)
+        await db.youtube_etags.update_one(
+            {'key': key},
+            {'$set': {
+                'etag': etag,
+                'value': encoded,
+                'checked_at': now,
+                'expires_at': cache_expiry()
+            }},
+            upsert=True
+        )
+
+    def revalidated(self, key: str, entry: ETagEntry) -> ETagEntry:
+        # Only the in-memory copy is touched; a 304 should not cost a write
+        entry.checked_at = time.time()
+        self.entries[key] = entry
+        return entry
+
+youtube_etags = ETagCache(YOUTUBE_ETAG_CACHE_SIZE)
+
+async def fetch_video_info(youtube: YouTubeClient, video_id: str) -> VideoInfo:
+    """Video metadata, revalidated with If-None-Match once it is a minute old.
+
+    Titles and counters barely move within minutes, so a hot video is
+    answered from memory and otherwise usually costs a bodiless 304.
+    """
+    key = f'videos:{video_id}'
+    cached = await youtube_etags.get(key, lambda value: VideoInfo(**value))
+    if cached is not None and time.time() - cached.checked_at < VIDEO_INFO_FRESH_SECONDS:
+        return cached.value
+    
+    video_response = await youtube.list_videos(
+        part='snippet,statistics',
+        id=video_id,
+        etag=cached.etag if cached is not None else None
+    )
+    if video_response is None:
+        return youtube_etags.revalidated(key, cached).value
+    
+    if not video_response.get('items'):
+        raise HTTPException(status_code=404, detail="Video not found")
+    
+    video_info = parse_video_info(video_id, video_response['items'][0])
+    await youtube_etags.put(key, video_response.get('etag'), video_info, video_info.model_dump())
+    return video_info
+
+def parse_video_info(video_id: str, video_data: dict) -> VideoInfo:
+    return VideoInfo(
+        video_id=video_id,
+        title=video_data['snippet']['title'],
+        channel_title=video_data['snippet']['channelTitle'],
+        thumbnail_url=video_data['snippet']['thumbnails']['high']['url'],
+        view_count=video_data['statistics'].get('viewCount', '0'),
+        like_count=video_data['statistics'].get('likeCount', '0'),
+        comment_count=video_data['statistics'].get('commentCount', '0')
+    )
+
+def parse_comment_snippet(comment_id: str, snippet: dict, parent_id: Optional[str] = None,
+                          bot_score: float = 0.0, bot_reasons: Sequence[str] = ()) -> Comment:
+    return Comment(
+        comment_id=comment_id,
+        author=snippet['authorDisplayName'],
+        text=snippet['textDisplay'],
+        author_channel_url=snippet.get('authorChannelUrl', ''),
+        author_profile_image_url=snippet.get('authorProfileImageUrl', ''),
+        published_at=snippet['publishedAt'],
+        like_count=snippet.get('likeCount', 0),
+        is_bot=bot_score >= BOT_SCORE_THRESHOLD,
+        bot_score=bot_score,
+        bot_reasons=bot_reasons,
+        parent_id=parent_id
+    )
+
+def parse_comment_page(items: List[dict], fetched_replies: Optional[Dict[str, List[dict]]] = None) -> List[Comment]:
+    """Parse one API page of comment threads and bot-score it as a batch.
+
+    Each thread is followed by its replies, if they were requested. A reply
+    list paged in full from comments.list replaces the inline one.
+    """
+    if fetched_replies is None:
+        fetched_replies = {}
+    entries = []  # (comment_id, snippet, parent_id)
+    for item in items:
+        entries.append((item['id'], item['snippet']['topLevelComment']['snippet'], None))
+        replies = fetched_replies.get(item['id'], item.get('replies', {}).get('comments', []))
+        entries.extend((reply['id'], reply['snippet'], item['id']) for reply in replies)
+    
+    with metrics.timed('stage_duration_seconds', stage='bot_scoring'):
+        scores = score_comment_batch(
+            [snippet['authorDisplayName'] for _, snippet, _ in entries],
+            [snippet['textDisplay'] for _, snippet, _ in entries],
+            [snippet['publishedAt'] for _, snippet, _ in entries]
+        )
+    with metrics.timed('stage_duration_seconds', stage='parse_comments'):
+        return [parse_comment_snippet(*entry, *score) for entry, score in zip(entries, scores)]
+
+def needs_reply_fetch(item: dict) -> bool:
+    """Whether a thread has more replies than commentThreads returned inline"""
+    inline = len(item.get('replies', {}).get('comments', []))
+    return item['snippet'].get('totalReplyCount', 0) > min(inline, YOUTUBE_INLINE_REPLIES)
+
+async def fetch_thread_replies(youtube: YouTubeClient, thread_id: str, semaphore: asyncio.Semaphore) -> List[dict]:
+    """Page through every reply of one thread once a worker slot is free"""
+    replies = []
+    next_page_token = None
+    
+    async with semaphore:
+        while True:
+            reply_response = await youtube.list_comments(
                 part='snippet',
-                videoId=video_id,
+                parentId=thread_id,
                 maxResults=100,
                 pageToken=next_page_token,
                 textFormat='plainText'
-            ).execute()
-            
-            for item in comment_response.get('items', []):
-                comment_data = item['snippet']['topLevelComment']['snippet']
-                author = comment_data['authorDisplayName']
-                text = comment_data['textDisplay']
-                
-                comments.append(Comment(
-                    author=author,
-                    text=text,
-                    author_channel_url=comment_data.get('authorChannelUrl', ''),
-                    author_profile_image_url=comment_data.get('authorProfileImageUrl', ''),
-                    published_at=comment_data['publishedAt'],
-                    like_count=comment_data.get('likeCount', 0),
-                    is_bot=is_bot_comment(author, text)
-                ))
+            )
+            replies.extend(reply_response.get('items', []))
             
-            next_page_token = comment_response.get('nextPageToken')
+            next_page_token = reply_response.get('nextPageToken')
             if not next_page_token:
                 break
+    
+    return replies
+
+async def fetch_reply_lists(youtube: YouTubeClient, items: List[dict],
+                            semaphore: asyncio.Semaphore) -> Dict[str, List[dict]]:
+    """Every reply of the threads whose replies did not all come back inline"""
+    thread_ids = [item['id'] for item in items if needs_reply_fetch(item)]
+    reply_lists = await asyncio.gather(*(
+        fetch_thread_replies(youtube, thread_id, semaphore) for thread_id in thread_ids
+    ))
+    return dict(zip(thread_ids, reply_lists))
+
+async def list_comment_thread_page(youtube: YouTubeClient, video_id: str, order: str, include_replies: bool,
+                                   page_token: Optional[str] = None, etag: Optional[str] = None) -> Optional[dict]:
+    return await youtube.list_comment_threads(
+        part='snippet,replies' if include_replies else 'snippet',
+        videoId=video_id,
+        maxResults=100,
+        order=order,
+        pageToken=page_token,
+        textFormat='plainText',
+        etag=etag
+    )
+
+async def fetch_comment_page(youtube: YouTubeClient, video_id: str, order: str, include_replies: bool,
+                             semaphore: asyncio.Semaphore,
+                             page_token: Optional[str] = None) -> Tuple[List[Comment], Optional[str]]:
+    """Read and parse one page of threads as (comments, next_page_token)"""
+    comment_response = await list_comment_thread_page(youtube, video_id, order, include_replies, page_token)
+    items = comment_response.get('items', [])
+    fetched_replies = await fetch_reply_lists(youtube, items, semaphore) if include_replies else {}
+    return parse_comment_page(items, fetched_replies), comment_response.get('nextPageToken')
+
+class FirstCommentPage:
+    """A first page of threads as YouTube sent it, plus what this worker built from it.
+
+    Only the items and page token are stored, so the stored document stays
+    the size of one API page however long the threads' reply lists are.
+    Replies paged separately and the parsed comments are kept in memory and
+    rebuilt when the entry is loaded from the store.
+    """
+
+    def __init__(self, items: List[dict], next_page_token: Optional[str]):
+        self.items = items
+        self.next_page_token = next_page_token
+        self.fetched_replies: Optional[Dict[str, List[dict]]] = None
+        self.comments: Optional[List[Comment]] = None
+        self.blocklist_version: Optional[int] = None  # the blocklist the comments were scored with
+
+async def fetch_first_comment_page(youtube: YouTubeClient, video_id: str, order: str, include_replies: bool,
+                                   semaphore: asyncio.Semaphore) -> Tuple[List[Comment], Optional[str]]:
+    """The first page of threads, revalidated against the copy from last time.
+
+    Delta refreshes of an active video start here, so when nothing new was
+    posted the page comes back as a 304 and is not downloaded again; in this
+    worker it is not re-parsed either, unless the bot blocklist has changed.
+    """
+    key = f'commentThreads:{video_id}:{order}:{int(include_replies)}'
+    cached = await youtube_etags.get(key, lambda value: FirstCommentPage(value['items'], value['next_page_token']))
+    
+    comment_response = await list_comment_thread_page(
+        youtube, video_id, order, include_replies, etag=cached.etag if cached is not None else None
+    )
+    if comment_response is None:
+        page = youtube_etags.revalidated(key, cached).value
+    else:
+        page = FirstCommentPage(comment_response.get('items', []), comment_response.get('nextPageToken'))
+        await youtube_etags.put(
+            key, comment_response.get('etag'), page, {'items': page.items, 'next_page_token': page.next_page_token}
+        )
+    
+    if include_replies and page.fetched_replies is None:
+        page.fetched_replies = await fetch_reply_lists(youtube, page.items, semaphore)
+    if page.comments is None or page.blocklist_version != bot_blocklist.version:
+        page.comments = parse_comment_page(page.items, page.fetched_replies)
+        page.blocklist_version = bot_blocklist.version
+    return page.comments, page.next_page_token
+
+async def iter_comment_pages(youtube: YouTubeClient, video_id: str, order: str = 'time',
+                             include_replies: bool = False) -> AsyncIterator[List[Comment]]:
+    """Yield comments one API page of threads at a time.
+
+    With include_replies, threads whose replies did not all fit inline have
+    them paged concurrently, at most REPLY_FETCH_CONCURRENCY threads at once
+    per video.
+    """
+    semaphore = asyncio.Semaphore(REPLY_FETCH_CONCURRENCY)
+    page, next_page_token = await fetch_first_comment_page(youtube, video_id, order, include_replies, semaphore)
+    
+    while True:
+        yield page
+        if not next_page_token:
+            break
+        page, next_page_token = await fetch_comment_page(
+            youtube, video_id, order, include_replies, semaphore, next_page_token
+        )
+
+async def fetch_from_youtube(video_id: str, max_comments: Optional[int] = 500, client_id: str = 'background',
+                             include_replies: bool = False) -> Tuple[VideoInfo, List[Comment], bool]:
+    """Return (video_info, comments, complete) where complete means every thread was read"""
+    youtube = get_youtube_client()
+    video_info = await fetch_video_info(youtube, video_id)
+    
+    comments = []
+    complete = True
+    async with quota_scheduler.reserve(client_id, estimate_page_units(video_info, max_comments)):
+        async for page in iter_comment_pages(youtube, video_id, include_replies=include_replies):
+            comments.extend(page)
+            if max_comments is not None and len(comments) >= max_comments:
+                complete = False
+                break
+    
+    return video_info, comments, complete
+
+async def get_cached_video_doc(video_id: str) -> Optional[dict]:
+    return await db.videos.find_one({'video_id': video_id})
+
+# Newest first; a comment cap keeps the first max_comments in this order
+CACHED_COMMENT_SORT = [('published_at', -1), ('comment_id', 1)]
+
+def cached_comments_query(video_id: str, generation: str, published_before: Optional[str] = None,
+                          include_replies: bool = True) -> dict:
+    query = {'video_id': video_id, 'generation': generation}
+    if published_before is not None:
+        query['published_at'] = {'$lte': published_before}
+    if not include_replies:
+        query['parent_id'] = None
+    return query
+
+def cached_comments_cursor(video_id: str, generation: str, published_before: Optional[str] = None,
+                           include_replies: bool = True, limit: Optional[int] = None):
+    cursor = db.comments.find(
+        cached_comments_query(video_id, generation, published_before, include_replies),
+        {'_id': 0, 'video_id': 0, 'generation': 0, 'expires_at': 0}
+    ).sort(CACHED_COMMENT_SORT)
+    return cursor.limit(limit) if limit is not None else cursor
+
+async def load_cached_comments(video_doc: dict, include_replies: bool = False,
+                               max_comments: Optional[int] = None) -> List[Comment]:
+    """The newest max_comments of a cached set, however many more it holds"""
+    cursor = cached_comments_cursor(
+        video_doc['video_id'], video_doc['generation'], include_replies=include_replies, limit=max_comments
+    )
+    with metrics.timed('stage_duration_seconds', stage='cache_read'):
+        # Stored comments were validated when they were fetched
+        return [Comment.model_construct(**doc) async for doc in cursor]
+
+async def summarise_cached_video(video_doc: dict, include_replies: bool = False,
+                                 max_comments: Optional[int] = None) -> dict:
+    """Totals for the comments load_cached_comments would return, counted in the store rather than loaded"""
+    pipeline = [{'$match': cached_comments_query(video_doc['video_id'], video_doc['generation'],
+                                                 include_replies=include_replies)}]
+    if max_comments is not None:
+        pipeline += [{'$sort': dict(CACHED_COMMENT_SORT)}, {'$limit': max_comments}]
+    pipeline.append({'$group': {
+        '_id': None,
+        'total': {'$sum': 1},
+        'bots': {'$sum': {'$cond': ['$is_bot', 1, 0]}},
+        'newest': {'$max': '$published_at'}
+    }})
+    totals = await db.comments.aggregate(pipeline).to_list(1)
+    totals = totals[0] if totals else {'total': 0, 'bots': 0, 'newest': ''}
+    return {
+        'video_info': video_doc['video_info'],
+        'total_comments': totals['total'],
+        'bots_detected': totals['bots'],
+        'newest': totals['newest'],
+        'generation': video_doc['generation'],
+        'cached': True
+    }
+
+def cache_is_stale(video_doc: dict) -> bool:
+    return time.time() - video_doc['fetched_at'] > COMMENT_CACHE_FRESH_SECONDS
+
+def count_cache_lookup(video_doc: Optional[dict], covered: bool) -> bool:
+    if not covered:
+        result = 'miss'
+    else:
+        result = 'stale' if cache_is_stale(video_doc) else 'hit'
+    metrics.inc('comment_cache_lookups_total', result=result)
+    return covered
+
+def cache_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=COMMENT_CACHE_TTL_SECONDS)
+
+async def insert_cached_comments(video_id: str, generation: str, expires_at: datetime, comments: List[Comment]):
+    if comments:
+        with metrics.timed('stage_duration_seconds', stage='cache_write'):
+            await db.comments.insert_many([
+                {**c.model_dump(), 'video_id': video_id, 'generation': generation, 'expires_at': expires_at}
+                for c in comments
+            ])
+
+async def commit_cached_video(video_id: str, video_info: VideoInfo, generation: str, expires_at: datetime,
+                              comment_count: int, complete: bool, include_replies: bool = False):
+    """Point the video at a fully written generation and drop older ones no live session is pinned to.
+
+    Pinned generations are left to their own expiry, or to a later commit
+    once their sessions have gone.
+    """
+    await db.videos.update_one(
+        {'video_id': video_id},
+        {'$set': {
+            'video_info': video_info.model_dump(),
+            'generation': generation,
+            'comment_count': comment_count,
+            'complete': complete,
+            'include_replies': include_replies,
+            'fetched_at': time.time(),
+            'expires_at': expires_at
+        }},
+        upsert=True
+    )
+    pinned = await db.comment_sessions.distinct('videos.generation', {
+        'videos.video_id': video_id,
+        'expires_at': {'$gt': datetime.now(timezone.utc)}
+    })
+    await db.comments.delete_many({'video_id': video_id, 'generation': {'$nin': [generation, *pinned]}})
+
+async def store_cached_video(video_id: str, video_info: VideoInfo, comments: List[Comment],
+                             complete: bool, include_replies: bool = False) -> str:
+    """Replace the cached comment set for a video and return its generation.
+
+    Comments are written under a new generation first and the video document
+    is switched over afterwards, so readers never see a half-written set.
+    """
+    generation = uuid.uuid4().hex
+    expires_at = cache_expiry()
+    
+    await insert_cached_comments(video_id, generation, expires_at, comments)
+    await commit_cached_video(video_id, video_info, generation, expires_at, len(comments), complete, include_replies)
+    return generation
+
+def cache_covers(video_doc: dict, max_comments: Optional[int], include_replies: bool = False) -> bool:
+    """Whether a cached comment set is large enough to answer a fetch"""
+    if include_replies and not video_doc.get('include_replies', False):
+        return False
+    if video_doc.get('complete', False):
+        return True
+    return max_comments is not None and video_doc.get('comment_count', 0) >= max_comments
+
+async def fetch_new_comments(youtube: YouTubeClient, video_id: str, generation: str,
+                             latest_published_at: str, include_replies: bool = False) -> List[Comment]:
+    """Page newest-first and stop at the first thread that is already cached.
+
+    Replies follow their thread on each page, so they are kept or dropped
+    with it; new replies to threads already cached are not picked up.
+    """
+    new_comments = []
+    
+    async for page in iter_comment_pages(youtube, video_id, order='time', include_replies=include_replies):
+        seen_ids = set(await db.comments.distinct('comment_id', {
+            'video_id': video_id,
+            'generation': generation,
+            'comment_id': {'$in': [c.comment_id for c in page]}
+        }))
+        
+        reached_cached = False
+        for comment in page:
+            if comment.parent_id is None and (
+                comment.comment_id in seen_ids or comment.published_at < latest_published_at
+            ):
+                reached_cached = True
+                break
+            new_comments.append(comment)
         
-        bots_detected = sum(1 for c in comments if c.is_bot)
+        if reached_cached:
+            break
+    
+    return new_comments
+
+async def delta_refresh_video(video_id: str, client_id: str = 'background') -> Optional[int]:
+    """Merge comments posted since the last fetch into the cached set.
+
+    Returns the number of new comments, or None if the video is not cached.
+    """
+    video_doc = await get_cached_video_doc(video_id)
+    if video_doc is None:
+        return None
+    
+    generation = video_doc['generation']
+    latest = await db.comments.find_one(
+        {'video_id': video_id, 'generation': generation, 'parent_id': None},
+        {'published_at': 1},
+        sort=[('published_at', -1)]
+    )
+    
+    youtube = get_youtube_client()
+    # A delta usually needs a page or two, so it is scheduled as a small fetch
+    async with quota_scheduler.reserve(client_id, 2 * YOUTUBE_QUOTA_COSTS['commentThreads']):
+        video_info = await fetch_video_info(youtube, video_id)
+        new_comments = await fetch_new_comments(
+            youtube, video_id, generation, latest['published_at'] if latest else '',
+            video_doc.get('include_replies', False)
+        )
+    
+    expires_at = cache_expiry()
+    await insert_cached_comments(video_id, generation, expires_at, new_comments)
+    await db.comments.update_many(
+        {'video_id': video_id, 'generation': generation},
+        {'$set': {'expires_at': expires_at}}
+    )
+    await db.videos.update_one(
+        {'video_id': video_id, 'generation': generation},
+        {
+            '$set': {
+                'video_info': video_info.model_dump(),
+                'fetched_at': time.time(),
+                'expires_at': expires_at
+            },
+            '$inc': {'comment_count': len(new_comments)}
+        }
+    )
+    
+    return len(new_comments)
+
+async def fetch_and_cache_video(video_id: str, max_comments: Optional[int], client_id: str,
+                                include_replies: bool) -> Tuple[VideoInfo, List[Comment], bool, str]:
+    video_info, comments, complete = await fetch_from_youtube(video_id, max_comments, client_id, include_replies)
+    generation = await store_cached_video(video_id, video_info, comments, complete, include_replies)
+    return video_info, comments, complete, generation
+
+# Full fetches currently paging, keyed by video_id, with the comment cap and reply mode they were started with
+inflight_fetches: Dict[str, Tuple[Optional[int], bool, asyncio.Task]] = {}
+# Delta refreshes currently running, keyed by video_id
+inflight_delta_refreshes: Dict[str, asyncio.Task] = {}
+metrics.gauge('inflight_fetches', "Full comment fetches currently paging", lambda: len(inflight_fetches))
+metrics.gauge('inflight_delta_refreshes', "Delta refreshes currently running", lambda: len(inflight_delta_refreshes))
+
+def forget_inflight(registry: dict, key: str, task: asyncio.Task):
+    entry = registry.get(key)
+    if entry is task or (isinstance(entry, tuple) and entry[-1] is task):
+        del registry[key]
+    # Nobody may be awaiting any more, so retrieve the outcome here
+    if not task.cancelled():
+        task.exception()
+
+def fetch_covers(fetch_max: Optional[int], max_comments: Optional[int]) -> bool:
+    return fetch_max is None or (max_comments is not None and fetch_max >= max_comments)
+
+def newest_comments(comments: List[Comment], max_comments: Optional[int]) -> List[Comment]:
+    """Keep the comments a cached read capped at max_comments would return, in their original order"""
+    if max_comments is None or len(comments) <= max_comments:
+        return comments
+    ordered = sorted(comments, key=lambda c: c.comment_id or '')
+    ordered.sort(key=lambda c: c.published_at, reverse=True)
+    kept = {id(c) for c in ordered[:max_comments]}
+    return [c for c in comments if id(c) in kept]
+
+async def coalesced_fetch(video_id: str, max_comments: Optional[int] = 500, client_id: str = 'background',
+                          include_replies: bool = False) -> Tuple[VideoInfo, List[Comment], bool, str]:
+    """Fetch and cache a video, sharing one pagination between concurrent callers.
+
+    Returns (video_info, comments, complete, generation).
+
+    A caller joins a fetch already paging the same video if its comment cap is
+    at least as large and it reads replies the same way, and gets the shared
+    result cut back to its own cap. The shared task is shielded so one caller
+    disconnecting does not cancel it for the rest.
+    """
+    entry = inflight_fetches.get(video_id)
+    if entry is not None and fetch_covers(entry[0], max_comments) and entry[1] == include_replies:
+        task = entry[2]
+    else:
+        task = asyncio.create_task(fetch_and_cache_video(video_id, max_comments, client_id, include_replies))
+        inflight_fetches[video_id] = (max_comments, include_replies, task)
+        task.add_done_callback(lambda t: forget_inflight(inflight_fetches, video_id, t))
+    video_info, comments, complete, generation = await asyncio.shield(task)
+    capped = newest_comments(comments, max_comments)
+    return video_info, capped, complete and len(capped) == len(comments), generation
+
+async def coalesced_delta_refresh(video_id: str, client_id: str = 'background') -> Optional[int]:
+    task = inflight_delta_refreshes.get(video_id)
+    if task is None:
+        task = asyncio.create_task(delta_refresh_video(video_id, client_id))
+        inflight_delta_refreshes[video_id] = task
+        task.add_done_callback(lambda t: forget_inflight(inflight_delta_refreshes, video_id, t))
+    return await asyncio.shield(task)
+
+# Stale-while-revalidate refreshes currently running, keyed by video_id
+cache_refresh_tasks: Dict[str, asyncio.Task] = {}
+
+async def refresh_cached_video(video_id: str):
+    try:
+        if await coalesced_delta_refresh(video_id) is None:
+            await coalesced_fetch(video_id)
+    except Exception as e:
+        logging.error(f"Error refreshing cached comments for {video_id}: {str(e)}")
+    finally:
+        cache_refresh_tasks.pop(video_id, None)
+
+def schedule_cache_refresh(video_id: str):
+    if video_id not in cache_refresh_tasks:
+        cache_refresh_tasks[video_id] = asyncio.create_task(refresh_cached_video(video_id))
+
+async def create_comment_session(videos: List[Tuple[str, str, str, Optional[int]]],
+                                 include_replies: bool = False) -> str:
+    """Record a handle to the cached comment sets a client was shown.
+
+    videos holds (video_id, generation, published_before, max_comments)
+    tuples. Each set is pinned to the cache generation it was read from, to
+    comments published up to the newest one the client received and to the
+    comment cap it was served with, so neither delta refreshes nor another
+    client's bigger fetch change the pool between draws.
+    """
+    session_id = uuid.uuid4().hex
+    await db.comment_sessions.insert_one({
+        'session_id': session_id,
+        'videos': [
+            {'video_id': video_id, 'generation': generation, 'published_before': published_before,
+             'max_comments': max_comments}
+            for video_id, generation, published_before, max_comments in videos
+        ],
+        'include_replies': include_replies,
+        'expires_at': datetime.now(timezone.utc) + timedelta(seconds=COMMENT_SESSION_TTL_SECONDS)
+    })
+    return session_id
+
+async def session_comment_cursors(session_id: str) -> list:
+    """One cursor per video in the session, in the order they were added"""
+    session = await db.comment_sessions.find_one({'session_id': session_id})
+    if session is None:
+        raise HTTPException(status_code=404, detail="Comment session not found or expired")
+    
+    cursors = []
+    for video in session['videos']:
+        video_id, generation = video['video_id'], video['generation']
+        # A re-fetch keeps the generations live sessions are pinned to, but they
+        # still expire with the cache
+        video_doc = await get_cached_video_doc(video_id)
+        if video_doc is None or (
+            video_doc['generation'] != generation
+            and await db.comments.find_one({'video_id': video_id, 'generation': generation}, {'_id': 1}) is None
+        ):
+            raise HTTPException(status_code=410, detail="Comment session has expired, please fetch comments again")
+        cursors.append(cached_comments_cursor(
+            video_id, generation, video['published_before'],
+            session.get('include_replies', False), video.get('max_comments')
+        ))
+    return cursors
+
+async def load_session_pool(session_id: str) -> CommentPool:
+    pool = CommentPool()
+    for cursor in await session_comment_cursors(session_id):
+        async for doc in cursor:
+            pool.append(doc)
+    return pool
+
+def youtube_error_to_http(e: YouTubeAPIError) -> HTTPException:
+    if e.reason == 'commentsDisabled':
+        return HTTPException(status_code=400, detail="Comments are disabled for this video")
+    elif e.reason == 'quotaExceeded':
+        return HTTPException(status_code=429, detail="YouTube API quota exceeded. Please try again later.")
+    elif e.reason == 'videoNotFound' or e.status == 404:
+        return HTTPException(status_code=404, detail="Video not found")
+    else:
+        return HTTPException(status_code=400, detail=f"YouTube API error: {str(e)}")
+
+@api_router.post("/youtube/fetch-comments", response_model=FetchCommentsResponse)
+async def fetch_comments(request: FetchCommentsRequest, req: Request, fields: Optional[str] = None):
+    """Fetch a video's comments; ?fields=author,text trims each comment to those fields"""
+    await check_rate_limit(req, 'fetch')
+
+    try:
+        comment_fields = parse_fields(fields)
+        video_id = extract_video_id(request.video_url)
+        
+        if request.refresh:
+            await coalesced_delta_refresh(video_id, req.client.host)
+        
+        video_doc = await get_cached_video_doc(video_id)
+        cached = count_cache_lookup(
+            video_doc, video_doc is not None and cache_covers(video_doc, request.max_comments, request.include_replies)
+        )
+        if cached:
+            video_info = VideoInfo(**video_doc['video_info'])
+            generation = video_doc['generation']
+            comments = await load_cached_comments(video_doc, request.include_replies, request.max_comments)
+            # Serve stale entries immediately and revalidate in the background
+            if cache_is_stale(video_doc):
+                schedule_cache_refresh(video_id)
+        else:
+            # A burst of requests for a newly shared video pages through it once
+            video_info, comments, complete, generation = await coalesced_fetch(
+                video_id, request.max_comments, req.client.host, request.include_replies
+            )
         
-        return FetchCommentsResponse(
-            video_info=video_info,
-            comments=comments,
-            total_comments=len(comments),
-            bots_detected=bots_detected
+        bots_detected = sum(1 for c in comments if c.is_bot)
+        session_id = await create_comment_session(
+            [(video_id, generation, max((c.published_at for c in comments), default=''), request.max_comments)],
+            request.include_replies
         )
         
+        # Encoded straight from the projected dicts rather than revalidated
+        # through the response model, which dominates the cost for big sets
+        with metrics.timed('stage_duration_seconds', stage='serialize'):
+            return ORJSONResponse({
+                'video_info': video_info.model_dump(),
+                'comments': project_comments(comments, comment_fields),
+                'total_comments': len(comments),
+                'bots_detected': bots_detected,
+                'cached': cached,
+                'session_id': session_id
+            })
+        
     except HTTPException:
         raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except HttpError as e:
-        error_content = str(e)
-        if 'commentsDisabled' in error_content:
-            raise HTTPException(status_code=400, detail="Comments are disabled for this video")
-        elif 'quotaExceeded' in error_content:
-            raise HTTPException(status_code=429, detail="YouTube API quota exceeded. Please try again later.")
-        elif 'videoNotFound' in error_content or e.resp.status == 404:
-            raise HTTPException(status_code=404, detail="Video not found")
+    except YouTubeAPIError as e:
+        raise youtube_error_to_http(e)
+    except Exception as e:
+        logging.error(f"Error fetching comments: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+def ndjson_line(event: dict) -> bytes:
+    return orjson.dumps(event) + b'\n'
+
+async def stream_cached_comments(video_doc: dict, include_replies: bool = False,
+                                 fields: Tuple[str, ...] = COMMENT_FIELDS) -> AsyncIterator[bytes]:
+    batch = []
+    total = bots = 0
+    newest = ''
+    
+    async for doc in cached_comments_cursor(video_doc['video_id'], video_doc['generation'],
+                                            include_replies=include_replies):
+        batch.append(doc)
+        newest = max(newest, doc['published_at'])
+        if len(batch) >= 100:
+            total += len(batch)
+            bots += sum(1 for c in batch if c['is_bot'])
+            yield ndjson_line({'type': 'comments', 'comments': project_docs(batch, fields)})
+            batch = []
+    
+    if batch:
+        total += len(batch)
+        bots += sum(1 for c in batch if c['is_bot'])
+        yield ndjson_line({'type': 'comments', 'comments': project_docs(batch, fields)})
+    
+    session_id = await create_comment_session(
+        [(video_doc['video_id'], video_doc['generation'], newest, None)], include_replies
+    )
+    yield ndjson_line({
+        'type': 'done', 'total_comments': total, 'bots_detected': bots, 'cached': True, 'session_id': session_id
+    })
+
+async def cache_comment_pages(video_id: str, video_info: VideoInfo, generation: str, client_id: str,
+                              include_replies: bool = False,
+                              max_comments: Optional[int] = None) -> AsyncIterator[List[Comment]]:
+    """Write each API page to a new cache generation and yield it once stored.
+
+    Only the current page is held in memory. The generation is committed
+    after the last page, or once max_comments is reached, and discarded if
+    paging fails or the caller stops early; wrap it in aclosing() so that
+    happens as soon as the caller goes away.
+    """
+    expires_at = cache_expiry()
+    total = 0
+    complete = True
+    committed = False
+    
+    try:
+        async with quota_scheduler.reserve(client_id, estimate_page_units(video_info, max_comments)):
+            async for page in iter_comment_pages(get_youtube_client(), video_id, include_replies=include_replies):
+                await insert_cached_comments(video_id, generation, expires_at, page)
+                total += len(page)
+                yield page
+                if max_comments is not None and total >= max_comments:
+                    complete = False
+                    break
+        
+        await commit_cached_video(video_id, video_info, generation, expires_at, total, complete, include_replies)
+        committed = True
+    finally:
+        if not committed:
+            await db.comments.delete_many({'video_id': video_id, 'generation': generation})
+
+async def stream_youtube_comments(video_id: str, video_info: VideoInfo, client_id: str, include_replies: bool = False,
+                                  fields: Tuple[str, ...] = COMMENT_FIELDS) -> AsyncIterator[bytes]:
+    """Relay each API page to the client as it is written to the cache"""
+    total = bots = 0
+    newest = ''
+    generation = uuid.uuid4().hex
+    
+    try:
+        async with aclosing(cache_comment_pages(video_id, video_info, generation, client_id, include_replies)) as pages:
+            async for page in pages:
+                total += len(page)
+                bots += sum(1 for c in page if c.is_bot)
+                newest = max([newest] + [c.published_at for c in page])
+                yield ndjson_line({'type': 'comments', 'comments': project_comments(page, fields)})
+        
+        session_id = await create_comment_session([(video_id, generation, newest, None)], include_replies)
+        yield ndjson_line({
+            'type': 'done', 'total_comments': total, 'bots_detected': bots, 'cached': False, 'session_id': session_id
+        })
+    except HTTPException as e:
+        yield ndjson_line({'type': 'error', 'status': e.status_code, 'detail': e.detail})
+    except YouTubeAPIError as e:
+        error = youtube_error_to_http(e)
+        yield ndjson_line({'type': 'error', 'status': error.status_code, 'detail': error.detail})
+    except Exception as e:
+        logging.error(f"Error streaming comments: {str(e)}")
+        yield ndjson_line({'type': 'error', 'status': 500, 'detail': "Internal server error"})
+
+@api_router.post("/youtube/fetch-comments/stream")
+async def fetch_comments_stream(request: FetchCommentsRequest, req: Request, fields: Optional[str] = None):
+    """Stream every comment of a video as NDJSON, with no comment cap.
+
+    The first line carries the video info, followed by one line per page of
+    comments and a final ``done`` (or ``error``) line with the totals.
+    """
+    await check_rate_limit(req, 'fetch')
+
+    try:
+        comment_fields = parse_fields(fields)
+        video_id = extract_video_id(request.video_url)
+        
+        if request.refresh:
+            await coalesced_delta_refresh(video_id, req.client.host)
+        
+        video_doc = await get_cached_video_doc(video_id)
+        if count_cache_lookup(video_doc, video_doc is not None and cache_covers(video_doc, None, request.include_replies)):
+            video_info = VideoInfo(**video_doc['video_info'])
+            if cache_is_stale(video_doc):
+                schedule_cache_refresh(video_id)
+            comment_lines = stream_cached_comments(video_doc, request.include_replies, comment_fields)
         else:
-            raise HTTPException(status_code=400, detail=f"YouTube API error: {str(e)}")
+            video_info = await fetch_video_info(get_youtube_client(), video_id)
+            # Reject up front if the whole video cannot fit in today's budget
+            quota_scheduler.check(estimate_page_units(video_info, None))
+            comment_lines = stream_youtube_comments(
+                video_id, video_info, req.client.host, request.include_replies, comment_fields
+            )
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except YouTubeAPIError as e:
+        raise youtube_error_to_http(e)
     except Exception as e:
         logging.error(f"Error fetching comments: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
+    
+    async def body() -> AsyncIterator[bytes]:
+        yield ndjson_line({'type': 'video_info', 'video_info': video_info.model_dump()})
+        async for line in comment_lines:
+            yield line
+    
+    return StreamingResponse(body(), media_type='application/x-ndjson')
 
-@api_router.post("/youtube/pick-winners", response_model=PickWinnersResponse)
-async def pick_winners(request: PickWinnersRequest, req: Request):
-    check_rate_limit(req)
-
-    # VIP accounts that should always win if present
-    VIP_WINNERS = {'@Vanessa-y'}
-    
-    # Blacklisted users - appear normal in shuffling but can NEVER win
-    NEVER_WIN_USERNAMES = {
-        '@HarryResearch-s7o', '@hindigyanworld9511', '@jimmyjk007', '@arhambothra3994',
-        '@Tamatar-nk1bq', '@Perfect-os8we', '@Warrenxwarren', '@henryjames5757',
-        '@SurprisedColourfulShirt-hy1gb', '@Mack0txop0', '@pandagamer6822',
-        '@ManageHarryreviews', '@kishan6691', '@Alexander-oq4jj', '@Jethalala-nm4rk',
-        '@Gul-vu7gt', '@mrhelmention', '@Benalyhsdhd', '@varsh6871', '@jeffery09090',
-        '@goriM-oo4np', '@JefDorris', '@elizamark9990', '@ShortsAmazonaffiliate',
-        '@SmoothDrive-w3n', '@CureYourdiabetes', '@Herry-q2p', '@ZackZ-l2k',
-        '@DOT-x5k', '@ronakmall8032', '@LondonkaBusiness', '@darksideresearch',
-        '@Newzistick', '@CalvinReidStudios', '@zivagamingytvloger328', '@chef_7hb',
-        '@Andy933p', '@Vmgaminghddhp2', '@pammipyarelal7997', '@HarryHistory-f6d',
-        '@vaanirao999', '@gagandragamerz8473', '@nkgarg8374', '@Keu2nd',
-        '@historian2299', '@philipcozzolino8750', '@kristeen961', '@Target100-ns2lq',
-        '@dearraj8195', '@loophole9832', '@vinitbhattacharya7299', '@Alwaysfirst007',
-        '@sachinkumae9029', '@harryom9357', '@HbBh-yp9eq', '@linusvideoyt',
-        '@letsupgrade360', '@punitpareek4520', '@Gold-fo8is', '@rajeshroy2080',
-        '@MrDiljeet-n3j', '@gamerrox7337', '@Cody-q7p', '@Prakashxx95',
-        '@retropinclub-7793', '@mr.vishnu4804', '@gwblazeyt2295', '@sacinxd',
-        '@govindcX0007', '@marquesofficial6838', '@anilsartroom4573', '@jpnewsicstudio4072',
-        '@AftoYT', '@hemuandhemu', '@supersaf_2.021', '@vishnugaming8968',
-        '@codingclass2794', '@vassimkhanyt3177', '@hunny461', '@anujgamer5739',
-        '@neongamer2441', '@workwithGadgetFie', '@ascrafting5644', '@dipakdeepak8193',
-        '@utilitygamerz1252', '@kunit3692', '@zaviyar693', '@budgetshop7700',
-        '@readhindibook', '@Monk-uo4ib', '@Hunny781', '@Venomguy796',
-        '@passionbazz7129', '@udrwatautovlogs2250', '@surajka_gulam133', '@WhatIdid-fe3ji',
-        '@mrskrishna7896', '@harryMXmedia', '@EmilyLawsonYT', '@Juan2077m', '@AlanFn-2187',
-        '@_rajasthan_royals_r2489', '@lucky750ytc', '@dheeru.07793', '@sridungargarh1937',
-        '@MystorageHarish', '@PappuPaldoot', '@GoriShankar-rb8ll', '@Freesmurk',
-        '@killersquad6245', '@mayankmalhotra3257', '@NadhaNawshad-h4v', '@reviewgadget5425',
-        '@spritalitybyohm184', '@trulytamyra', '@agrowealthfoundation5537', '@AlexGw-w1v',
-        '@sumit_yt3838', '@nubier1964', '@BUISNESSACCNT', '@KoolDown345',
-        '@Gael40k', '@RickyHeatz', '@robbinthebert', '@Gabrielagho0',
-        '@neonzz09', '@UTIE3', '@Rexieluvs', '@totallynotbro',
-        '@myajujuju', '@peanutjelly93', '@bljoe89', '@dhruvskirtancorner1557',
-        '@totallynotxscarru', '@Kikikooks2', '@iPlaukelele', '@igloo490',
-        '@mxtroy', '@MilkyWayMY', '@Jacksonn9', '@Poki-Playzz',
-        '@adorablek3', '@Nityalilka', '@tokuchi-xxx', '@ReynoldsCars',
-        '@jinxxneon', '@looezzzz', '@hihiky2', '@lucky-summer',
-        '@DhirubhaiValabhbhai', '@manjulajenti46', '@Manshibharat01', '@amibooklover233',
-        '@VasuDevmorari', '@ShurbhiUchada', '@9xmxm', '@JamesWhitakerjm',
-        '@Pixelidodo', '@Marlon0093', '@TylaplaysRobloxz', '@MonoGram12342',
-        '@ilike-travelin', '@Jacoby-w9c', '@itsadelaguz', '@letsbepurple8818',
-        '@monnnnneyyÿŷ', '@chawty-is-a-shawty', '@lololovezzz', '@HoneyMoss132',
-        '@AbhishekMurmu-n5n', '@ArisuIsagi', '@paulluster7316', '@DilsithDilu',
-        '@tacotuesday-r8n', '@Cloudyrae90', '@HEHEXEX', '@robertblakejr.8570',
-        '@xscarru', '@CassieParfait22', '@surendarchandru', '@khushburamanandi',
-        '@Miss.esther', '@WaltAstral', '@YnezLux', '@Na_Tea',
-        '@CringeHawkEye', '@Xegalla', '@InnovatorXWZ', '@EndlessMethapor',
-        '@AkaTenshie', '@KidNextFloor', '@GGChron1cles', '@Klaxxxonnn',
-        '@Blayzye', '@OmniShadee', '@CapGamer7', '@CrateXHunter',
-        '@ArcaneKnight0', '@Lagg.Bucket', '@SabyyCute', '@MatrixVieL',
-        '@AshenScepter', '@thearrowkingg', '@SylVoKai', '@Quiviria',
-        '@Vien9', '@Cind-K-Stein', '@SoulMysticThread', '@TwentyOneBuck',
-        '@Goldbarss', '@AeraLeyth', '@Blood.Sh0tttt', '@Pixxel-Raider',
-        '@LuminousRae', '@SweetCuffer', '@sashaBee2', '@HuckleberryFn',
-        '@SyrJon', '@XP.Stealth', '@Quibblekyy', '@Nightmare_Duskk',
-        '@Lootz4DayZ', '@AFKDemonTribe', '@Level_Up_Legend6', '@B3yond_The_Frame',
-        '@GriimoireX', '@DxxterPDT', '@NoScop3Nexus', '@Respawnologist7',
-        '@RuneSeeker0', '@Night_Fall6', '@Bravarenth', '@Falarisx',
-        '@Lychaan', '@GhostCircuitt', '@AgniAssasin', '@KDCollector',
-        '@KnowFlow_Anime', '@DartKitten.V', '@PhoenixHL', '@IntelligentZombiie',
-        '@TheDaily.Drifty', '@LateNev3r', '@MechSeraPhy', '@Beer-_-Guyy',
-        '@MiniMancer2', '@Gayle-2', '@MaidenQT', '@Trixen4',
-        '@DoomFang-e', '@BOBPARKAWO', '@BrainBiteSky', '@SimplyUC',
-        '@gori_maheswari8994', '@shrivass1598', '@of_rice_and_men', '@HeyJayant',
-        '@shotaro_taroo', '@holleythelamo5094', '@K1NGP1N360', '@radeyradeyradeyradey',
-        '@HagfishTangelo', '@_onyourpalm', '@RV_kawaii', '@XiaoxinPad-w5y',
-        '@LostOfLearn', '@adadudud', '@Vishal-so3gk', '@Josegonzalez22-r7k', '@Nestormontenegro82', '@200mil6', 
-        '@GuillermoFronk', '@InsideSay1212', '@RazerBladeZ3', '@RayTrayCube', '@LencyCyC1', '@CesloLos', '@Princessshayz',
-        '@Shanethegreatness', '@StephCruzzie', '@Tuernylife', '@Valentinogeorgia', '@Winnerijay', '@nhanminh1447', '@PhilipDonaldCox', '@tienlam1770',
-        '@EugeneBailey_9662', '@danielphilipallen1995', '@ralphwatWson', '@AustinMaryPerez', '@kevinbennett1972', 
-'@TylerDennisChavez', '@larrychristianwilson18', '@CharlesWillieMorgan', '@haroldprice32',
-'@raSndydylanmartinez', '@Nicholas.Johnny.Martinez', '@jamesjonathangonzalez1970', '@billybaker1974', '@ChadAnthonyVentures', '@Mendezz140', '@StephanieAg_',
-'@Paulrichess', '@Naommey', '@AnitaSeweje', '@Charlotte_good', '@Demolzhappiness', '@Nengewilliams', '@Maamiserwaaa', '@Emmanuelwilz', '@Ginadenzel',
-'@aishatmarcus', '@Moeta.b', '@LostOfLearn', '@Mikasload', '@leooghost', '@Mi-qm7ug', '@popa4810', '@Botiichal', '@astrodive', '@Hirrakit',
-'@babi071', '@clover3854', '@chacha-ur6cb', '@Groovedude925', '@guillaumebarnabe998', '@Jack-i1v9c', '@music-kim1', '@audio--Bass-est',
-'@scout-mortal', '@DriveXR-e5p', '@grafire-j1o', '@ann4501', '@tommyb9144', '@amora_kyros', '@slythy9', '@SUPERxGOKU',
-'@Daxa-g1w', '@ForMusic-four', '@BigBaller989', '@maurya-1231', '@bryleewilliamson', '@starfire333', '@trini9352', 
-'@aleczanny', '@andyliu313', '@dreamcatcher8574', '@Neko-wx3sk',
-'@nicholas2040', '@giagg11', '@razaop3168', '@G전범지연', '@원-달-예린', '@공세아44', '@차-국-현아', 
-'@MadeInLuke', '@pook-d5y', '@MikeStrangers-c1j', '@LPD-67', '@taescake', '@garnx', '@cortex4093',
-'@shinku76', '@Sayee9007', '@blankedoit', '@Yufinn', '@Alex-wallzy', '@Zozorijo', '@charlynestyles', 
-'@Carlos001-1', '@dunknmoj', '@daredevil-he', '@jinji_hi', '@fatu6357',
-'@rmsaeed', '@fairyclo', '@bohu6o', '@KwanruetaiHee', '@rmbvlog6551', '@sarahkat26', '@LinhVu-jm8mu',
-'@lanasotherland', '@silvivargas1426', '@BellaKT87', '@mteresaemond', '@seanleau', '@FigCloud', '@RavenRizz777',
-'@jacenbarkoff', '@mizermira', '@anaarevalo8425', 
-'@Thatlakelife', '@oLi102', '@Ahdrea_B', '@maxiclarkson', '@megnifico', '@MrCollect', '@emmascore', '@BlogeyPiper', '@JmyladyHandcrafted', '@yenwallz', 
-'@patticulver442', '@loyayyay', '@blureader1164', '@christinafredette8071', '@GOJ739', '@janetrivera1346', '@barbwolfrey1339', 
-'@Mb-hdk-937', '@tray2811', '@maopoamy', '@googoobird', '@epiphx', '@lumerionOG',
-'@Mabelosorio-s5o', '@MelissaGuzman-s2n', '@ricardomaster-q2l', '@mariaeugenia25-w6b', '@LudyRamirez-u3m', '@YolandaSopo-x4g', '@lunaart09', 
-'@MoenierHendricks-m5e', '@VictorHugo2526-p4n', '@KarolUyan-d8z', '@AngelesCarrillo-c8x', '@RaulGonzales-q2l', '@BraumPoro-x9k', '@Laura79367', 
-'@Alfredo_nuñez', '@HumbertoGomez-k6l', '@pruebabienvenidamoneda', '@SantiagoInfa-r6w', '@MarthaCordero-b9v', '@almejandro-q3r', '@CapsG2', 
-'@MariannaParra-v9q', '@Josepachin-o7m', '@EmiliaGómezdeSandoval', '@Andres__Cordero-m3o', '@AnitaAramcito-o3b', '@BradyOP-u2e', '@edwardjuliansandoval8757', 
-'@larrytravis', '@krad_slouds0', '@Hua770', '@ronniedadole7293', '@shirazmarcel', '@devilselbow69', '@therealpapparich', 
-'@superguppyme', '@andrewdrill', '@teddybee69', '@flyguycruwear', '@JakeJonsen', '@cksteven76', '@Sunrise_in_April', '@artisanblades', 
-'@u5fb', '@SiTiJaMuRmU05', '@Aprillovescats4ever90', '@Oats-y8x', '@Booklover889-l3y', '@A.M.sometimes', '@nivesworx', 
-'@niamagpie', '@knivesnutz', '@marcingrail', '@garryyap', '@yolandiestre', '@courtnexD', '@andruroher', '@frankkgaming', '@yaleidysmargaritagonzalescarip', 
-'@migueLdavidSilvaa', '@epicplayz2001', '@nicoIasfr7832', '@gonchuforexmx', '@elenaarg.8473', '@cecabrera5', '@rickyphineas5165', '@kellyrichard7295', '@juancruzferreira', 
-'@lamaneracorrecta6044', '@gammesger', '@tedismithi', '@Carol-gc6kj', '@dshifflett806', '@YBABTU', '@rogerbee', '@matthnee', '@ciarasnoow', 
-'@juanaviIa7388', '@natthveaz', '@marcohappyxD', '@befernando', '@markiiramos', '@paulwwong68', '@serenalove623', '@ommaticfim', '@lucialulu8392', 
-'@catterinaborgogno', '@EricCRONy', '@chuiongamer', '@moxicau', '@stevemathie9683', '@harvviphps', '@shishitoedoo', '@redy2kI', '@RYBBwaker', 
-'@Jessimirandas', '@daniicaidas', '@kariitox', '@katelynstamper9821', '@ronconnies6090', '@ericavelcover9065', '@kellymarker288', 
-'@MrDahlia.', '@OliviaLenhart-i8i', '@Saantyda2', '@brissajcs', '@shirley4822', '@kimbberlyi', '@chiquikawaikpoper8357', 
-'@Adriamnatosramon', '@Skryling', '@jakkecruz', '@driddesantos1762', '@adrians8024', '@jimmmm', '@micheel1958.', '@markstorete', 
-'@Nehemiaslnvierte', '@biripochi9182', '@benjatam10', '@XQATR', '@karinaveracruz', '@Lilianaecliaceve', '@dorcassimon589', '@joseph18e', '@MarcoMorettig20', 
-'@MatteoDeLuca-10', '@andresanchez343', '@shankzsxc', '@sebastiian9885', '@lorenzogento', '@markguenim9114', '@yeisonmartineez', '@brianhutchinson7683', 
-'@moreenogua', '@DelmarClifton-u7n', '@laura_amydog', '@kimberlyholt3056', '@LisaDufault-q2l', '@Brook-k6d', '@markbriHanthompson', '@thanhhữu51', '@Eric-Jordan-Miller', 
-'@darrensmith9564', '@thymscd87', '@dancingdo.7', '@Nahiiden', '@tsukisytcorner', '@maiionpar', '@j_yeet', '@foodiefodder', '@FakerT1-s9e', 
-'@JavierSierra-v2u', '@ReatigaMon', '@Kevingil-w6n', '@Aynah-v8j', '@Mowa-e6i', '@vintagebookshelves', '@trouble0702', '@larrypatriciamiller35', 
-'@DungLe_7uu4s5', '@PaulLawrenceRichardson', '@gregorynoahjames17', '@russellwilson1962', '@brucethompson1981', '@michaelhaskell7421','@TheAnt9242', '@abialo2010', '@StrikeWarden', 
-'@t.j.poland2480', '@jodyalbert3426', '@andrewmiller6480', 
-
-'@JuanaSilviaPerez', '@Jebussallin', '@JetEarlewood', '@jayem1826', '@LaxmaiahTalari', '@RobInCasinos2.0', '@luxuryondemand', 
-'@danielllllk32087', '@Scott_Wheat', '@mikeperez114', '@mhmad131', '@RamkrishunMukhiya1', '@fatihabeloufa766', '@Total_gamingz_m', '@MohamedKamil-c9d', '@gamigchannel-kartik', 
-'@ANSH-8018', '@MoumenDj-i3i', '@HahdeAli', '@ruthvik-b8k', '@Parmesh-rn3yz', '@NarenderduttDutt', '@freefirelover-l5v', 
-'@RaviKumar-e9k4z', '@stofalstif8427', '@MohammedAsri-u7l', '@pawanptelpawanptel290', '@NikhilDubey-tw6xu', '@MoeenShah-t8p', '@BLACK-444-r8i', 
-'@Bandeirasoares', '@comedyshow-m8m', '@team_01_comedy', '@BatoulAskar-e3o', '@NileshParmar-w5j7w', '@RajlodhaRajlodha-q6g', '@Marianny-e6n', 
-'@ManishaNepali-n6l', '@AbeerZayzafoun', '@JohnsonCoach-z7b', '@ميزرميزرعمر', '@RiteshKumar-qe8nl', '@MKDADAli-v6j', '@GuddiSaini-u3l', 
-'@CrashPandaBoo', '@josWekeithturner', '@AdamChristianParker', '@Henry.Arthur.Gonzalez', '@SeanPrice-4713', '@BillyGomez_3018', '@stevenallen2008', 
-'@WilliamCampbell_8011', '@PatrickHoward_7021', '@Nethansanders', '@GregoryNathanSanchez', '@LouisMatthewGray', '@ericwalterchavez1953', '@randYyparker', 
-'@Ethan-Douglas-Sanchez', '@dylanmoUrris', '@Frank-Paul-Jimenez', '@paparapapopopo', '@ensetrump', '@D-moneky-luffy', '@fufuxia5', '@Relaxcenter-x7w', '@zakootaAa', '@HappyGaming7342', 
-'@josegomez-xh8yr', '@Cry0Spectre', '@SilenTrigger2', '@Keiceee88', '@ptbngoc45', 
-'@KENTURTLES671', '@vivnaidoo7900', '@MichaelGates-b9z', '@bryanjohnson6619', '@Tobez21', '@AnimalHouse3323', '@shannondupont3051', 
+class FetchJobState:
+    """A job run by this process; watchers wait on ``changed`` for its next update"""
+
+    def __init__(self, doc: dict, sequence: int, client_id: str):
+        self.doc = doc
+        self.sequence = sequence
+        self.client_id = client_id
+        self.changed = asyncio.Event()
+        # Set once the submit has written the job document, or given up on it
+        self.stored = asyncio.Event()
+        self.abandoned = False
+
+    async def update(self, **fields):
+        fields['updated_at'] = time.time()
+        self.doc.update(fields)
+        await db.fetch_jobs.update_one({'job_id': self.doc['job_id']}, {'$set': fields})
+        # Wake everyone waiting on this update; later waiters get a fresh event
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+class FetchJobQueue:
+    """Bounded queue of background fetches drained by a fixed pool of workers.
+
+    Job documents live in MongoDB, so any worker process can answer a poll.
+    The process running a job also keeps it in memory and wakes its event
+    streams on every page. A submission for a video that already has a job
+    queued or running with the same settings joins that job.
+    """
+
+    def __init__(self, workers: int, max_queued: int):
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(max_queued)
+        self.jobs: Dict[str, FetchJobState] = {}
+        self.active: Dict[Tuple[str, Optional[int], bool], str] = {}  # (video_id, max_comments, include_replies) -> job_id
+        self.submitted = 0
+        self.started = 0
+        self.tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.doc['status'] == 'running')
+
+    def start(self):
+        self.tasks = [asyncio.create_task(self.work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        # Taken first: running jobs drop out of self.jobs as they are cancelled
+        unfinished = list(self.jobs)
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if unfinished:
+            await db.fetch_jobs.update_many(
+                {'job_id': {'$in': unfinished}, 'status': {'$in': ['queued', 'running']}},
+                {'$set': {
+                    'status': 'failed',
+                    'error_status': 503,
+                    'error': "The server restarted before this fetch finished, please submit it again",
+                    'updated_at': time.time()
+                }}
+            )
 
+    def view(self, job: FetchJobState) -> FetchJob:
+        queued_ahead = max(0, job.sequence - self.started) if job.doc['status'] == 'queued' else None
+        return FetchJob(**job.doc, queued_ahead=queued_ahead)
+
+    async def get(self, job_id: str) -> FetchJob:
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return self.view(job)
+        doc = await db.fetch_jobs.find_one({'job_id': job_id}, {'_id': 0})
+        if doc is None:
+            raise HTTPException(status_code=404, detail="Fetch job not found or expired")
+        return FetchJob(**doc)
+
+    async def wait(self, job: FetchJob, timeout: float) -> FetchJob:
+        """Return the job once it moves on from ``job``, or as it is after ``timeout``"""
+        state = self.jobs.get(job.job_id)
+        if state is None:
+            # Run by another process, or already finished
+            await asyncio.sleep(min(timeout, FETCH_JOB_POLL_SECONDS))
+        elif state.doc['updated_at'] == job.updated_at:
+            try:
+                await asyncio.wait_for(state.changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return await self.get(job.job_id)
+
+    async def submit(self, video_id: str, video_info: VideoInfo, request: FetchJobRequest, client_id: str) -> FetchJob:
+        key = (video_id, request.max_comments, request.include_replies)
+        job_id = self.active.get(key)
+        if job_id is not None:
+            return self.view(self.jobs[job_id])
         
-}
+        now = time.time()
+        doc = new_fetch_job_doc(video_id, request, now, status='queued', video_info=video_info.model_dump())
+        job = FetchJobState(doc, self.submitted, client_id)
+        # The slot is taken before any await, so concurrent submits cannot overfill the queue
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many fetches are queued, please try again shortly",
+                headers={'Retry-After': str(FETCH_JOB_RETRY_AFTER_SECONDS)}
+            )
+        self.submitted += 1
+        self.jobs[doc['job_id']] = job
+        self.active[key] = doc['job_id']
+        
+        try:
+            await db.fetch_jobs.insert_one({**doc, 'expires_at': fetch_job_expiry()})
+        except BaseException:
+            # The worker that dequeues it will skip it
+            job.abandoned = True
+            self.jobs.pop(doc['job_id'], None)
+            self.active.pop(key, None)
+            raise
+        finally:
+            job.stored.set()
+        return self.view(job)
+
+    async def work(self):
+        while True:
+            job = await self.queue.get()
+            self.started += 1
+            try:
+                await self.run(job)
+            finally:
+                self.queue.task_done()
+
+    async def run(self, job: FetchJobState):
+        # A worker can dequeue the job before its document is written
+        await job.stored.wait()
+        if job.abandoned:
+            return
+        doc = job.doc
+        video_id, include_replies = doc['video_id'], doc['include_replies']
+        try:
+            await job.update(status='running')
+            pages = total = bots = 0
+            newest = ''
+            generation = uuid.uuid4().hex
+            async with aclosing(cache_comment_pages(
+                video_id, VideoInfo(**doc['video_info']), generation, job.client_id, include_replies, doc['max_comments']
+            )) as comment_pages:
+                async for page in comment_pages:
+                    pages += 1
+                    total += len(page)
+                    bots += sum(1 for c in page if c.is_bot)
+                    newest = max([newest] + [c.published_at for c in page])
+                    await job.update(pages=pages, comments_fetched=total, bots_detected=bots)
+            
+            totals = {}
+            if doc['max_comments'] is not None and total > doc['max_comments']:
+                # The last page ran past the cap; report the set the session will draw from
+                summary = await summarise_cached_video(
+                    {'video_id': video_id, 'generation': generation, 'video_info': doc['video_info']},
+                    include_replies, doc['max_comments']
+                )
+                totals = {'comments_fetched': summary['total_comments'], 'bots_detected': summary['bots_detected']}
+            session_id = await create_comment_session(
+                [(video_id, generation, newest, doc['max_comments'])], include_replies
+            )
+            await job.update(status='done', session_id=session_id, **totals)
+        except HTTPException as e:
+            await job.update(status='failed', error_status=e.status_code, error=e.detail)
+        except YouTubeAPIError as e:
+            error = youtube_error_to_http(e)
+            await job.update(status='failed', error_status=error.status_code, error=error.detail)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Error running fetch job {doc['job_id']}: {str(e)}")
+            await job.update(status='failed', error_status=500, error="Internal server error")
+        finally:
+            self.jobs.pop(doc['job_id'], None)
+            self.active.pop((video_id, doc['max_comments'], include_replies), None)
+
+def new_fetch_job_doc(video_id: str, request: FetchJobRequest, now: float, **fields) -> dict:
+    return {
+        'job_id': uuid.uuid4().hex,
+        'video_id': video_id,
+        'include_replies': request.include_replies,
+        'max_comments': request.max_comments,
+        'created_at': now,
+        'updated_at': now,
+        **fields
+    }
+
+def fetch_job_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=FETCH_JOB_TTL_SECONDS)
+
+fetch_job_queue = FetchJobQueue(FETCH_JOB_WORKERS, FETCH_JOB_QUEUE_SIZE)
+metrics.gauge('fetch_job_queue_depth', "Background fetch jobs waiting for a worker", lambda: fetch_job_queue.queue.qsize())
+metrics.gauge('fetch_jobs_running', "Background fetch jobs currently paging", lambda: fetch_job_queue.running)
+
+@api_router.post("/youtube/fetch-jobs", response_model=FetchJob, status_code=202)
+async def submit_fetch_job(request: FetchJobRequest, req: Request):
+    """Queue a fetch to run in the background and return its job.
+
+    Follow it with GET /youtube/fetch-jobs/{job_id} or the /events stream.
+    A video whose comments are already cached comes back as a finished job.
+    """
+    await check_rate_limit(req, 'fetch')
 
     try:
-        eligible_comments = request.comments.copy()
-        total_initial = len(eligible_comments)
+        video_id = extract_video_id(request.video_url)
         
-        eligible_comments = [c for c in eligible_comments if not c.is_bot]
+        video_doc = await get_cached_video_doc(video_id)
+        covered = video_doc is not None and cache_covers(video_doc, request.max_comments, request.include_replies)
+        if count_cache_lookup(video_doc, covered):
+            if cache_is_stale(video_doc):
+                schedule_cache_refresh(video_id)
+            summary = await summarise_cached_video(video_doc, request.include_replies, request.max_comments)
+            doc = new_fetch_job_doc(
+                video_id, request, time.time(),
+                status='done',
+                video_info=summary['video_info'],
+                comments_fetched=summary['total_comments'],
+                bots_detected=summary['bots_detected'],
+                cached=True,
+                session_id=await create_comment_session(
+                    [(video_id, summary['generation'], summary['newest'], request.max_comments)], request.include_replies
+                )
+            )
+            await db.fetch_jobs.insert_one({**doc, 'expires_at': fetch_job_expiry()})
+            return FetchJob(**doc)
         
-        if request.exclude_duplicates:
-            seen_authors = set()
-            unique_comments = []
-            for comment in eligible_comments:
-                if comment.author not in seen_authors:
-                    seen_authors.add(comment.author)
-                    unique_comments.append(comment)
-            eligible_comments = unique_comments
-        
-        if request.keyword_filter and request.keyword_filter.strip():
-            keywords = [k.strip().lower() for k in request.keyword_filter.split(',')]
-            eligible_comments = [
-                c for c in eligible_comments
-                if any(keyword in c.text.lower() for keyword in keywords)
-            ]
+        video_info = await fetch_video_info(get_youtube_client(), video_id)
+        # Reject up front if the fetch cannot fit in today's budget
+        quota_scheduler.check(estimate_page_units(video_info, request.max_comments))
+        return await fetch_job_queue.submit(video_id, video_info, request, req.client.host)
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except YouTubeAPIError as e:
+        raise youtube_error_to_http(e)
+    except Exception as e:
+        logging.error(f"Error submitting fetch job: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@api_router.get("/youtube/fetch-jobs/{job_id}", response_model=FetchJob)
+async def get_fetch_job(job_id: str, req: Request):
+    await check_rate_limit(req, 'jobs')
+    return await fetch_job_queue.get(job_id)
+
+def sse_event(job: FetchJob) -> bytes:
+    return b'event: ' + job.status.encode() + b'\ndata: ' + orjson.dumps(job.model_dump()) + b'\n\n'
+
+@api_router.get("/youtube/fetch-jobs/{job_id}/events")
+async def follow_fetch_job(job_id: str, req: Request):
+    """Server-sent events with the job's progress.
+
+    Each event is named after the job status (queued, running, done or
+    failed) and carries the job as JSON; the stream ends after done or failed.
+    """
+    await check_rate_limit(req, 'jobs')
+    job = await fetch_job_queue.get(job_id)
+    
+    async def events() -> AsyncIterator[bytes]:
+        current = job
+        yield sse_event(current)
+        last_sent = time.monotonic()
+        while current.status in ('queued', 'running'):
+            latest = await fetch_job_queue.wait(current, FETCH_JOB_KEEPALIVE_SECONDS)
+            if latest != current:
+                current = latest
+                yield sse_event(current)
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= FETCH_JOB_KEEPALIVE_SECONDS:
+                yield b': keepalive\n\n'
+                last_sent = time.monotonic()
+    
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def encode_browse_cursor(state: dict) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(state)).rstrip(b'=').decode()
+
+def decode_browse_cursor(cursor: str) -> dict:
+    try:
+        state = orjson.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(state, dict) or not {'generation', 'sort', 'q', 'key', 'comment_id'} <= state.keys():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # The key and comment ID go straight into a query, so anything but a plain
+    # value of the sort field's type could smuggle in an operator
+    sort = BROWSE_SORTS.get(state['sort']) if isinstance(state['sort'], str) else None
+    if (sort is None or not isinstance(state['generation'], str) or not isinstance(state['comment_id'], str)
+            or type(state['key']) is not BROWSE_KEY_TYPES[sort[0]]):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return state
+
+@api_router.get("/youtube/videos/{video_id}/comments", response_model=CommentPage)
+async def browse_comments(video_id: str, req: Request, cursor: Optional[str] = None,
+                          limit: int = BROWSE_PAGE_SIZE, sort: Literal['newest', 'oldest', 'likes'] = 'newest',
+                          q: Optional[str] = None, include_replies: bool = False, fields: Optional[str] = None):
+    """Page through a cached video's comments with keyset cursors.
+
+    Each page resumes after the last comment of the previous one, so a page
+    costs the same however deep the client has scrolled. ``q`` matches text
+    or author, case-insensitively.
+    """
+    await check_rate_limit(req, 'browse')
+    
+    comment_fields = parse_fields(fields)
+    limit = max(1, min(limit, BROWSE_MAX_PAGE_SIZE))
+    q = q.strip() if q and q.strip() else None
+    
+    video_doc = await get_cached_video_doc(video_id)
+    if not count_cache_lookup(video_doc, video_doc is not None and cache_covers(video_doc, 0, include_replies)):
+        raise HTTPException(status_code=404, detail="Comments for this video are not cached, please fetch them first")
+    if cache_is_stale(video_doc):
+        schedule_cache_refresh(video_id)
+    
+    query = {'video_id': video_id, 'generation': video_doc['generation']}
+    if not include_replies:
+        query['parent_id'] = None
+    if q:
+        pattern = {'$regex': re.escape(q), '$options': 'i'}
+        query['$or'] = [{'text': pattern}, {'author': pattern}]
+    
+    sort_field, direction = BROWSE_SORTS[sort]
+    page_query = query
+    if cursor:
+        state = decode_browse_cursor(cursor)
+        if state['sort'] != sort or state['q'] != q:
+            raise HTTPException(status_code=400, detail="Cursor does not match this sort and search")
+        if state['generation'] != video_doc['generation']:
+            raise HTTPException(status_code=410, detail="The comments were refetched, please start from the first page")
+        page_query = {'$and': [query, {'$or': [
+            {sort_field: {'$lt' if direction < 0 else '$gt': state['key']}},
+            {sort_field: state['key'], 'comment_id': {'$gt': state['comment_id']}}
+        ]}]}
+    
+    projection = {'_id': 0, **{f: 1 for f in comment_fields}, sort_field: 1, 'comment_id': 1}
+    docs = await db.comments.find(page_query, projection).sort(
+        [(sort_field, direction), ('comment_id', 1)]
+    ).limit(limit + 1).to_list(limit + 1)
+    
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_browse_cursor({
+            'generation': video_doc['generation'], 'sort': sort, 'q': q,
+            'key': docs[-1][sort_field], 'comment_id': docs[-1]['comment_id']
+        })
+    
+    return ORJSONResponse({
+        'video_id': video_id,
+        'comments': [{f: doc.get(f) for f in comment_fields} for doc in docs],
+        'next_cursor': next_cursor,
+        'total_matches': None if cursor else await db.comments.count_documents(query)
+    })
+
+async def fetch_playlist_video_ids(youtube: YouTubeClient, playlist_id: str, max_videos: int) -> List[str]:
+    video_ids = []
+    next_page_token = None
+    
+    while len(video_ids) < max_videos:
+        playlist_response = await youtube.list_playlist_items(
+            part='contentDetails',
+            playlistId=playlist_id,
+            maxResults=min(50, max_videos - len(video_ids)),
+            pageToken=next_page_token
+        )
+        video_ids.extend(item['contentDetails']['videoId'] for item in playlist_response.get('items', []))
+        
+        next_page_token = playlist_response.get('nextPageToken')
+        if not next_page_token:
+            break
+    
+    return video_ids[:max_videos]
+
+async def fetch_channel_uploads_playlist(youtube: YouTubeClient, channel_url: str) -> str:
+    kind, ref = extract_channel_ref(channel_url)
+    channel_response = await youtube.list_channels(
+        part='contentDetails',
+        **({'id': ref} if kind == 'id' else {'forHandle': ref})
+    )
+    
+    if not channel_response.get('items'):
+        raise HTTPException(status_code=404, detail="Channel not found")
+    return channel_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+
+async def resolve_giveaway_videos(request: FetchGiveawayRequest) -> List[str]:
+    """Collect the giveaway's video IDs in request order, without repeats"""
+    youtube = get_youtube_client()
+    max_videos = max(1, min(request.max_videos, MAX_GIVEAWAY_VIDEOS))
+    video_ids = [extract_video_id(url) for url in request.video_urls]
+    
+    if request.playlist_url:
+        video_ids += await fetch_playlist_video_ids(youtube, extract_playlist_id(request.playlist_url), max_videos)
+    if request.channel_url:
+        # A channel's uploads playlist lists its newest videos first
+        uploads = await fetch_channel_uploads_playlist(youtube, request.channel_url)
+        video_ids += await fetch_playlist_video_ids(youtube, uploads, max_videos)
+    
+    video_ids = list(dict.fromkeys(video_ids))
+    if not video_ids:
+        raise HTTPException(status_code=400, detail="No videos found for this giveaway")
+    if len(video_ids) > MAX_GIVEAWAY_VIDEOS:
+        raise HTTPException(status_code=400, detail=f"A giveaway can span at most {MAX_GIVEAWAY_VIDEOS} videos")
+    return video_ids
+
+async def cache_giveaway_video(video_id: str, request: FetchGiveawayRequest, client_id: str) -> dict:
+    """Make sure one video's comments are cached and summarise them for progress"""
+    video_doc = await get_cached_video_doc(video_id)
+    covered = video_doc is not None and cache_covers(video_doc, request.max_comments_per_video, request.include_replies)
+    if count_cache_lookup(video_doc, covered):
+        if cache_is_stale(video_doc):
+            schedule_cache_refresh(video_id)
+        return await summarise_cached_video(video_doc, request.include_replies, request.max_comments_per_video)
+    
+    video_info, comments, complete, generation = await coalesced_fetch(
+        video_id, request.max_comments_per_video, client_id, request.include_replies
+    )
+    return {
+        'video_info': video_info.model_dump(),
+        'total_comments': len(comments),
+        'bots_detected': sum(1 for c in comments if c.is_bot),
+        'newest': max((c.published_at for c in comments), default=''),
+        'generation': generation,
+        'cached': False
+    }
+
+async def stream_giveaway_progress(video_ids: List[str], request: FetchGiveawayRequest,
+                                   client_id: str) -> AsyncIterator[bytes]:
+    semaphore = asyncio.Semaphore(GIVEAWAY_VIDEO_CONCURRENCY)
+    
+    async def fetch_one(video_id: str) -> Tuple[str, Optional[dict], Optional[HTTPException]]:
+        async with semaphore:
+            try:
+                return video_id, await cache_giveaway_video(video_id, request, client_id), None
+            except HTTPException as e:
+                return video_id, None, e
+            except YouTubeAPIError as e:
+                return video_id, None, youtube_error_to_http(e)
+            except Exception as e:
+                logging.error(f"Error fetching giveaway video {video_id}: {str(e)}")
+                return video_id, None, HTTPException(status_code=500, detail="Internal server error")
+    
+    tasks = [asyncio.create_task(fetch_one(video_id)) for video_id in video_ids]
+    summaries = {}
+    total = bots = failed = 0
+    try:
+        yield ndjson_line({'type': 'videos', 'video_ids': video_ids})
         
+        for next_done in asyncio.as_completed(tasks):
+            video_id, summary, error = await next_done
+            if error is not None:
+                failed += 1
+                yield ndjson_line({
+                    'type': 'video_error', 'video_id': video_id, 'status': error.status_code, 'detail': error.detail
+                })
+                continue
+            
+            summaries[video_id] = summary
+            total += summary['total_comments']
+            bots += summary['bots_detected']
+            yield ndjson_line({
+                'type': 'video_done', 'video_id': video_id, 'video_info': summary['video_info'],
+                'total_comments': summary['total_comments'], 'bots_detected': summary['bots_detected'],
+                'cached': summary['cached']
+            })
+        
+        if not summaries:
+            yield ndjson_line({'type': 'error', 'status': 400, 'detail': "None of the giveaway videos could be fetched"})
+            return
+        
+        # Keep the request order so the merged pool, and any draw over it, is reproducible
+        session_id = await create_comment_session(
+            [(video_id, summaries[video_id]['generation'], summaries[video_id]['newest'], request.max_comments_per_video)
+             for video_id in video_ids if video_id in summaries],
+            request.include_replies
+        )
+        yield ndjson_line({
+            'type': 'done', 'videos_fetched': len(summaries), 'videos_failed': failed,
+            'total_comments': total, 'bots_detected': bots, 'session_id': session_id
+        })
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@api_router.post("/youtube/fetch-giveaway/stream")
+async def fetch_giveaway_stream(request: FetchGiveawayRequest, req: Request):
+    """Fetch a giveaway spanning several videos, a playlist or a channel's uploads.
+
+    Videos are fetched concurrently and reported as NDJSON as each one
+    finishes. The final ``done`` line carries a session over all of them;
+    drawing from it with exclude_duplicates counts each participant once
+    across every video.
+    """
+    await check_rate_limit(req, 'fetch')
+    
+    try:
+        video_ids = await resolve_giveaway_videos(request)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except YouTubeAPIError as e:
+        raise youtube_error_to_http(e)
+    except Exception as e:
+        logging.error(f"Error resolving giveaway videos: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    return StreamingResponse(
+        stream_giveaway_progress(video_ids, request, req.client.host),
+        media_type='application/x-ndjson'
+    )
+
+def eligibility_check(request: PickWinnersRequest) -> Callable[[str, str, bool], bool]:
+    """Build a one-comment-at-a-time version of the draw filters.
+
+    The check takes a comment's author, text and bot flag, so it can run on
+    pool columns or raw stored documents without building models.
+
+    The check is stateful when exclude_duplicates is set: it remembers the
+    authors it has accepted, so comments must be offered in pool order.
+    That set is the only thing it holds on to.
+    """
+    seen_authors = set()
+    excluded_set = set(request.excluded_authors)
+    matcher = None
+    if request.keyword_filter and request.keyword_filter.strip():
+        matcher = get_keyword_matcher(
+            request.keyword_filter, request.keyword_whole_word, request.keyword_mode == 'all'
+        )
+    
+    def check(author: str, text: str, is_bot: bool) -> bool:
+        if is_bot:
+            return False
+        if request.exclude_duplicates:
+            # An author's first comment stands for them, whether or not it passes the keyword filter
+            if author in seen_authors:
+                return False
+            seen_authors.add(author)
+        if matcher is not None and not matcher.matches(text):
+            return False
         # Exclude previously selected winners
-        if request.excluded_authors:
-            excluded_set = set(request.excluded_authors)
-            eligible_comments = [c for c in eligible_comments if c.author not in excluded_set]
+        return author not in excluded_set
+    
+    return check
+
+async def build_eligible_pool(pool: CommentPool, request: PickWinnersRequest,
+                              near_duplicates_removed: Optional[Sequence[int]] = None) -> List[int]:
+    """Apply the draw filters in order and return the eligible positions.
+
+    Every step keeps the input order, so the same comments and filters always
+    give the same pool in the same order, which a draw replay relies on.
+    Pass near_duplicates_removed when the near-duplicate filter has already
+    run over this pool, to skip clustering.
+    """
+    candidates: Iterable[int] = range(len(pool))
+    if request.near_duplicates != 'keep':
+        if near_duplicates_removed is None:
+            near_duplicates_removed = await near_duplicate_removals(pool, request)
+        removed = set(near_duplicates_removed)
+        candidates = [i for i in candidates if i not in removed]
+    
+    check = eligibility_check(request)
+    authors, texts, is_bots = pool.authors, pool.texts, pool.is_bots
+    with metrics.timed('stage_duration_seconds', stage='eligibility'):
+        return [i for i in candidates if check(authors[i], texts[i], is_bots[i])]
+
+def update_pool_hash(digest, entry_key: str):
+    digest.update(entry_key.encode())
+    digest.update(b'\n')
+
+def hash_pool(pool: CommentPool, indices: List[int]) -> str:
+    """SHA-256 over the newline-terminated entry keys, in pool order"""
+    digest = hashlib.sha256()
+    for i in indices:
+        update_pool_hash(digest, pool.entry_key(i))
+    return digest.hexdigest()
+
+def draw_key(seed: str, client_seed: Optional[str], pool_hash: str) -> bytes:
+    return hashlib.sha256(f"{seed}:{client_seed or ''}:{pool_hash}".encode()).digest()
+
+def uniform_below(key: bytes, counter: int, bound: int) -> int:
+    """Unbiased integer in [0, bound) from an HMAC-SHA256 stream, by rejection"""
+    limit = (1 << 64) - (1 << 64) % bound
+    attempt = 0
+    while True:
+        block = hmac.new(key, counter.to_bytes(8, 'big') + attempt.to_bytes(4, 'big'), hashlib.sha256).digest()
+        value = int.from_bytes(block[:8], 'big')
+        if value < limit:
+            return value % bound
+        attempt += 1
+
+def sample_indices(key: bytes, n: int, k: int) -> List[int]:
+    """Pick k distinct indices from range(n) with a sparse Fisher-Yates shuffle.
+
+    Only the swapped positions are stored, so time and memory are O(k)
+    however large the pool is.
+    """
+    swapped: Dict[int, int] = {}
+    picks = []
+    for i in range(k):
+        j = i + uniform_below(key, i, n - i)
+        picks.append(swapped.get(j, j))
+        swapped[j] = swapped.get(i, i)
+    return picks
+
+def replay_draw(record: dict) -> List[int]:
+    return sample_indices(
+        draw_key(record['seed'], record.get('client_seed'), record['pool_hash']),
+        record['pool_size'], len(record['winner_indices'])
+    )
+
+def draw_receipt(record: dict) -> DrawReceipt:
+    return DrawReceipt(
+        draw_id=record['draw_id'],
+        algorithm=record['algorithm'],
+        pool_hash=record['pool_hash'],
+        pool_size=record['pool_size'],
+        seed_commitment=record['seed_commitment'],
+        seed=record['seed'],
+        client_seed=record.get('client_seed'),
+        winner_indices=record['winner_indices']
+    )
+
+def hash_positions(positions: Sequence[int]) -> str:
+    return hashlib.sha256(','.join(map(str, positions)).encode()).hexdigest()
+
+async def commit_draw(request: PickWinnersRequest, pool_hash: str, pool_size: int,
+                      near_duplicates_removed: Optional[Sequence[int]] = None) -> dict:
+    """Record a fresh seed against the eligible pool, before any winner is chosen.
+
+    The commitment is written first, so the recorded seed cannot be swapped
+    afterwards for one that gives a different result. The near-duplicate
+    filter's removals are kept as a count and hash, which a verify that
+    clusters the pool again can be checked against.
+    """
+    seed = secrets.token_hex(32)
+    record = {
+        'draw_id': uuid.uuid4().hex,
+        'algorithm': DRAW_ALGORITHM,
+        'request': request.model_dump(exclude={'comments'}),
+        'pool_hash': pool_hash,
+        'pool_size': pool_size,
+        'seed_commitment': hashlib.sha256(seed.encode()).hexdigest(),
+        'seed': seed,
+        'client_seed': request.client_seed,
+        'status': 'committed',
+        'created_at': datetime.now(timezone.utc)
+    }
+    if near_duplicates_removed is not None:
+        record['near_duplicates_removed'] = len(near_duplicates_removed)
+        record['near_duplicates_hash'] = hash_positions(near_duplicates_removed)
+    await db.draws.insert_one(record)
+    return record
+
+async def record_winners(record: dict, indices: List[int], winner_ids: List[str]) -> DrawReceipt:
+    record.update({'winner_indices': indices, 'winner_ids': winner_ids, 'status': 'drawn'})
+    await db.draws.update_one(
+        {'draw_id': record['draw_id']},
+        {'$set': {k: record[k] for k in ('winner_indices', 'winner_ids', 'status')}}
+    )
+    return draw_receipt(record)
+
+async def run_draw(pool: CommentPool, eligible: List[int], winner_count: int, request: PickWinnersRequest,
+                   near_duplicates_removed: Optional[Sequence[int]] = None) -> DrawReceipt:
+    """Commit to the eligible entries and a fresh seed, then draw and record the outcome"""
+    with metrics.timed('stage_duration_seconds', stage='pool_hash'):
+        pool_hash = hash_pool(pool, eligible)
+    record = await commit_draw(request, pool_hash, len(eligible), near_duplicates_removed)
+    
+    with metrics.timed('stage_duration_seconds', stage='draw'):
+        indices = sample_indices(draw_key(record['seed'], request.client_seed, pool_hash), len(eligible), winner_count)
+    return await record_winners(record, indices, [pool.entry_key(eligible[i]) for i in indices])
+
+async def stream_session_entries(cursors: list,
+                                 request: PickWinnersRequest) -> AsyncIterator[Tuple[Optional[str], dict]]:
+    """Yield (entry key, stored comment) for every comment of a session in pool order.
+
+    The entry key is None for comments the draw filters leave out.
+    """
+    check = eligibility_check(request)
+    for cursor in cursors:
+        async for doc in cursor:
+            if check(doc['author'], doc['text'], doc['is_bot']):
+                yield comment_entry_key(doc.get('comment_id'), doc['author'], doc['published_at'], doc['text']), doc
+            else:
+                yield None, doc
+
+async def run_streamed_draw(request: PickWinnersRequest) -> Tuple[List[Comment], int, int, DrawReceipt]:
+    """Draw from a session in two passes over storage, without building the pool.
+
+    The first pass hashes and counts the eligible comments, and the seed is
+    committed alongside that pool hash before anything is selected, exactly
+    as in run_draw. The winners' positions are then drawn with the same
+    sparse shuffle and picked up on a second pass. Memory is the winners plus,
+    with exclude_duplicates, the set of authors seen so far. Multi-video
+    sessions are read one video after another, so the author dedupe applies
+    across all of them. Returns (winners, total_comments, total_eligible, receipt).
+    """
+    digest = hashlib.sha256()
+    total = pool_size = 0
+    with metrics.timed('stage_duration_seconds', stage='pool_hash'):
+        async for entry_key, _ in stream_session_entries(await session_comment_cursors(request.session_id), request):
+            total += 1
+            if entry_key is not None:
+                update_pool_hash(digest, entry_key)
+                pool_size += 1
+    if pool_size == 0:
+        raise HTTPException(status_code=400, detail="No eligible comments found with current filters")
+    
+    pool_hash = digest.hexdigest()
+    record = await commit_draw(request, pool_hash, pool_size)
+    
+    key = draw_key(record['seed'], request.client_seed, pool_hash)
+    indices = sample_indices(key, pool_size, min(request.winner_count, pool_size))
+    wanted = set(indices)
+    found: Dict[int, Tuple[str, dict]] = {}
+    digest = hashlib.sha256()
+    position = 0
+    # Reading from storage dominates this stage, the selection itself is O(winners)
+    with metrics.timed('stage_duration_seconds', stage='streamed_draw'):
+        async for entry_key, doc in stream_session_entries(await session_comment_cursors(request.session_id), request):
+            if entry_key is None:
+                continue
+            update_pool_hash(digest, entry_key)
+            if position in wanted:
+                found[position] = (entry_key, doc)
+            position += 1
+    
+    # A session's comments are pinned, so both passes must have read the same pool
+    if position != pool_size or digest.hexdigest() != pool_hash:
+        await db.draws.delete_one({'draw_id': record['draw_id']})
+        raise HTTPException(status_code=409, detail="The comment pool changed during the draw, please try again")
+    
+    receipt = await record_winners(record, indices, [found[i][0] for i in indices])
+    
+    # Stored comments were validated when they were fetched
+    winners = [Comment.model_construct(**found[i][1]) for i in indices]
+    return winners, total, pool_size, receipt
+
+@api_router.post("/youtube/pick-winners", response_model=PickWinnersResponse)
+async def pick_winners(request: PickWinnersRequest, req: Request):
+    await check_rate_limit(req, 'draw')
+
+    try:
+        # Near-duplicate clustering needs the whole pool at once; every other
+        # filter can run as comments stream out of storage
+        if request.session_id and request.near_duplicates == 'keep':
+            winners, total, total_eligible, draw = await run_streamed_draw(request)
+            return PickWinnersResponse(
+                winners=winners,
+                total_eligible=total_eligible,
+                total_filtered=total - total_eligible,
+                draw=draw
+            )
         
-        # Exclude blacklisted users (they appear in shuffling but can never win)
-        eligible_comments = [c for c in eligible_comments if c.author not in NEVER_WIN_USERNAMES]
+        if request.session_id:
+            pool = await load_session_pool(request.session_id)
+        else:
+            pool = CommentPool.from_comments(request.comments)
         
-        total_eligible = len(eligible_comments)
+        removed = None
+        if request.near_duplicates != 'keep':
+            removed = await near_duplicate_removals(pool, request)
+        eligible = await build_eligible_pool(pool, request, removed)
+        total_eligible = len(eligible)
         
         if total_eligible == 0:
             raise HTTPException(status_code=400, detail="No eligible comments found with current filters")
         
         winner_count = min(request.winner_count, total_eligible)
-        
-        # Check for VIP winners in eligible comments
-        vip_comments = [c for c in eligible_comments if c.author in VIP_WINNERS]
-        
-        if vip_comments:
-            # Randomly select from VIPs (equal chance for all VIPs)
-            vip_winner_count = min(winner_count, len(vip_comments))
-            winners = random.sample(vip_comments, vip_winner_count)
-            
-            # If more winners needed than VIPs available, fill with random non-VIPs
-            if len(winners) < winner_count:
-                remaining_comments = [c for c in eligible_comments if c not in winners]
-                additional_winners = random.sample(remaining_comments, min(winner_count - len(winners), len(remaining_comments)))
-                winners.extend(additional_winners)
-        else:
-            # No VIPs present, pick randomly
-            winners = random.sample(eligible_comments, winner_count)
+        draw = await run_draw(pool, eligible, winner_count, request, removed)
         
         return PickWinnersResponse(
-            winners=winners,
+            winners=[pool.comment(eligible[i]) for i in draw.winner_indices],
             total_eligible=total_eligible,
-            total_filtered=total_initial - total_eligible
+            total_filtered=len(pool) - total_eligible,
+            draw=draw
         )
         
     except HTTPException:
@@ -501,8 +2929,245 @@ async def pick_winners(request: PickWinnersRequest, req: Request):
         logging.error(f"Error picking winners: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@api_router.get("/youtube/draws/{draw_id}", response_model=DrawReceipt)
+async def get_draw(draw_id: str):
+    record = await db.draws.find_one({'draw_id': draw_id, 'status': 'drawn'})
+    if record is None:
+        raise HTTPException(status_code=404, detail="Draw not found")
+    return draw_receipt(record)
+
+def check_replay(record: dict, pool: CommentPool, eligible: List[int]) -> VerifyDrawResponse:
+    """Compare a recorded draw with a replay over the given eligible positions"""
+    pool_hash = hash_pool(pool, eligible)
+    indices = replay_draw(record)
+    replayed_ids = [pool.entry_key(eligible[i]) for i in indices if i < len(eligible)]
+    
+    pool_hash_matches = pool_hash == record['pool_hash']
+    winners_match = (
+        indices == record['winner_indices']
+        and hashlib.sha256(record['seed'].encode()).hexdigest() == record['seed_commitment']
+        and replayed_ids == record['winner_ids']
+    )
+    return VerifyDrawResponse(
+        draw_id=record['draw_id'],
+        verified=pool_hash_matches and winners_match,
+        pool_hash_matches=pool_hash_matches,
+        winners_match=winners_match,
+        winner_ids=record['winner_ids']
+    )
+
+@api_router.post("/youtube/draws/{draw_id}/verify", response_model=VerifyDrawResponse)
+async def verify_draw(draw_id: str, request: VerifyDrawRequest, req: Request):
+    """Replay a recorded draw against its pool.
+
+    Session draws rebuild the pool from the session while it is still alive;
+    draws over uploaded comments need the same comments sent again.
+    """
+    await check_rate_limit(req, 'verify')
+
+    record = await db.draws.find_one({'draw_id': draw_id, 'status': 'drawn'})
+    if record is None:
+        raise HTTPException(status_code=404, detail="Draw not found")
+    
+    draw_request = PickWinnersRequest(**record['request'])
+    if draw_request.session_id and not request.comments:
+        pool = await load_session_pool(draw_request.session_id)
+    else:
+        pool = CommentPool.from_comments(request.comments)
+    
+    # Clustering runs again here; any difference in what it removes shows up as a pool hash mismatch
+    eligible = await build_eligible_pool(pool, draw_request)
+    return check_replay(record, pool, eligible)
+
+@api_router.get("/youtube/quota", response_model=QuotaStatus)
+async def get_quota_status():
+    return QuotaStatus(
+        daily_budget=quota_scheduler.daily_budget,
+        used=min(quota_scheduler.used, quota_scheduler.daily_budget),
+        remaining=quota_scheduler.remaining,
+        reserved=quota_scheduler.reserved,
+        queue_depth=quota_scheduler.queue_depth,
+        resets_at=quota_scheduler.resets_at().isoformat()
+    )
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+def check_admin_key(request: Request):
+    if not ADMIN_API_KEY or request.headers.get('X-Admin-Key') != ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+@api_router.get("/admin/bot-blocklist", response_model=BlocklistStatus)
+async def get_bot_blocklist(req: Request):
+    check_admin_key(req)
+    return BlocklistStatus(version=bot_blocklist.version, total_usernames=len(bot_blocklist.usernames))
+
+@api_router.post("/admin/bot-blocklist", response_model=BlocklistStatus)
+async def update_bot_blocklist(request: BlocklistUpdateRequest, req: Request):
+    check_admin_key(req)
+
+    if request.add:
+        await db.bot_blocklist.bulk_write(
+            [UpdateOne({'username': username}, {'$set': {'username': username}}, upsert=True)
+             for username in request.add],
+            ordered=False
+        )
+    if request.remove:
+        await db.bot_blocklist.delete_many({'username': {'$in': request.remove}})
+    
+    await db.bot_blocklist_version.update_one({'_id': 'current'}, {'$inc': {'version': 1}}, upsert=True)
+    await reload_bot_blocklist()
+    
+    return BlocklistStatus(version=bot_blocklist.version, total_usernames=len(bot_blocklist.usernames))
+
 app.include_router(api_router)
 
+class GzipStream:
+    def __init__(self):
+        self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class BrotliStream:
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self.compressor.process(data) + (self.compressor.finish() if final else self.compressor.flush())
+
+def accept_encoding_weights(header: str) -> Dict[str, float]:
+    """q-value per content coding in an Accept-Encoding header; a malformed q counts as 0"""
+    weights = {}
+    for part in header.split(','):
+        coding, *params = (piece.strip() for piece in part.split(';'))
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.lower()] = weight
+    return weights
+
+def pick_response_encoding(header: str) -> Optional[str]:
+    """The client's most preferred of br and gzip, br on a tie; None if it refuses both"""
+    weights = accept_encoding_weights(header)
+    default = weights.get('*', 0.0)
+    encoding = max(('br', 'gzip'), key=lambda coding: weights.get(coding, default))
+    return encoding if weights.get(encoding, default) > 0 else None
+
+class CompressionMiddleware:
+    """Brotli or gzip response compression, picked from Accept-Encoding.
+
+    Each chunk of a streamed body is flushed through the compressor as it is
+    sent, so NDJSON progress lines are not held back waiting for more data.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        encoding = pick_response_encoding(Headers(scope=scope).get('Accept-Encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message: Optional[Message] = None
+        stream = None
+        
+        async def send_compressed(message: Message):
+            nonlocal start_message, stream
+            if message['type'] == 'http.response.start':
+                # Held back until the first body chunk shows whether to compress
+                start_message = message
+                return
+            if message['type'] != 'http.response.body':
+                await send(message)
+                return
+            
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message['headers'])
+                if 'content-encoding' not in headers and (more_body or len(body) >= self.minimum_size):
+                    stream = BrotliStream() if encoding == 'br' else GzipStream()
+                    headers['Content-Encoding'] = encoding
+                    headers.add_vary_header('Accept-Encoding')
+                    if more_body:
+                        del headers['Content-Length']
+                    else:
+                        body = stream.compress(body, final=True)
+                        headers['Content-Length'] = str(len(body))
+                        message = {**message, 'body': body}
+                        stream = None
+                await send(start_message)
+                start_message = None
+                if stream is None:
+                    await send(message)
+                    return
+            
+            if stream is not None:
+                message = {**message, 'body': stream.compress(body, final=not more_body)}
+            await send(message)
+        
+        await self.app(scope, receive, send_compressed)
+
+class MetricsMiddleware:
+    """Time each API request and attribute the YouTube calls made while serving it.
+
+    Sits inside the compression middleware so compression time is not
+    counted; streamed responses are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status = 500
+        start = time.perf_counter()
+        
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_stats.reset(token)
+            # The matched route's template keeps label cardinality bounded
+            route = scope.get('route')
+            if route is not None and route.path != '/api/metrics':
+                labels = {'route': route.path, 'method': scope['method']}
+                metrics.observe(
+                    'http_request_duration_seconds', time.perf_counter() - start, **labels, status=str(status)
+                )
+                metrics.observe('youtube_calls_per_request', stats.youtube_calls, **labels)
+                metrics.observe('youtube_pages_per_request', stats.youtube_pages, **labels)
+                metrics.observe('quota_units_per_request', stats.quota_units, **labels)
+
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -517,7 +3182,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_cache_indexes():
+    # expires_at drives Mongo's TTL monitor; entries are dropped once it passes
+    await db.videos.create_index('video_id', unique=True)
+    await db.videos.create_index('expires_at', expireAfterSeconds=0)
+    await db.comments.create_index([('video_id', 1), ('generation', 1), ('published_at', -1)])
+    await db.comments.create_index([('video_id', 1), ('generation', 1), ('like_count', -1)])
+    await db.comments.create_index('expires_at', expireAfterSeconds=0)
+    await db.comment_sessions.create_index('session_id', unique=True)
+    await db.comment_sessions.create_index('videos.video_id')
+    await db.comment_sessions.create_index('expires_at', expireAfterSeconds=0)
+    await db.rate_limits.create_index('expires_at', expireAfterSeconds=0)
+    await db.draws.create_index('draw_id', unique=True)
+    await db.youtube_etags.create_index('key', unique=True)
+    await db.youtube_etags.create_index('expires_at', expireAfterSeconds=0)
+    await db.fetch_jobs.create_index('job_id', unique=True)
+    await db.fetch_jobs.create_index('expires_at', expireAfterSeconds=0)
+
+@app.on_event("startup")
+async def load_youtube_quota():
+    await quota_scheduler.load()
+
+@app.on_event("startup")
+async def load_bot_blocklist():
+    await db.bot_blocklist.create_index('username', unique=True)
+    await seed_bot_blocklist()
+    await reload_bot_blocklist(force=True)
+    app.state.bot_blocklist_watcher = asyncio.create_task(watch_bot_blocklist())
+
+@app.on_event("startup")
+async def start_fetch_job_workers():
+    fetch_job_queue.start()
+
+@app.on_event("shutdown")
+async def stop_fetch_job_workers():
+    await fetch_job_queue.stop()
+
+@app.on_event("shutdown")
+async def stop_bot_blocklist_watcher():
+    app.state.bot_blocklist_watcher.cancel()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
 
+@app.on_event("shutdown")
+async def shutdown_youtube_client():
+    if youtube_client is not None:
+        await youtube_client.aclose()
+
@@ -0,0 +1,246 @@
+"""Offline benchmarks for the comment picker backend.
+
+Runs the FastAPI app in-process against the local YouTube stand-in in
+backend/fake_youtube.py, so the numbers cover our own code (paging, bot
+scoring, the comment store, filters and draws) and not the network. Needs a
+MongoDB; the benchmark uses its own database and drops it before and after.
+
+    MONGO_URL=mongodb://localhost:27017 python backend_benchmark.py --sizes 1000,100000,1000000
+    python backend_benchmark.py --json results.json
+    python backend_benchmark.py --baseline results.json  # exits 1 on a regression
+
+All synthetic data and draw seeds are fixed, so two runs on the same machine
+do the same work.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+PAGE_SIZE = 100  # comment threads per YouTube API page
+FILTER_CASES = {
+    'dedupe_authors': {'exclude_duplicates': True},
+    'keyword_any': {'keyword_filter': 'giveaway, pick me'},
+    'keyword_all_whole_word': {'keyword_filter': 'love, video', 'keyword_mode': 'all', 'keyword_whole_word': True},
+    'excluded_authors': {'excluded_authors': [f'@viewer{i}' for i in range(0, 2000, 2)]},
+    'near_duplicates': {'near_duplicates': 'exclude'},
+}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class BenchmarkRunner:
+    def __init__(self, args):
+        self.args = args
+        self.results = []
+
+    def record(self, name, size, samples, errors=0):
+        median = statistics.median(samples)
+        result = {
+            'name': name,
+            'size': size,
+            'runs': len(samples),
+            'median_s': median,
+            'p95_s': percentile(samples, 0.95),
+            'min_s': min(samples),
+            'items_per_s': size / median if median else None,
+            'errors': errors,
+        }
+        self.results.append(result)
+        throughput = f"{result['items_per_s']:>12,.0f}/s" if result['items_per_s'] else ' ' * 14
+        print(f"  {name:<34} {size:>9,}  median {median * 1000:>10.1f} ms  "
+              f"p95 {result['p95_s'] * 1000:>10.1f} ms  {throughput}" + (f"  errors {errors}" if errors else ''))
+        return result
+
+    async def timed(self, name, size, run):
+        """Time ``run()`` once per configured run; it returns False when the call failed"""
+        samples, errors = [], 0
+        for attempt in range(self.args.runs):
+            start = time.perf_counter()
+            ok = await run(attempt)
+            samples.append(time.perf_counter() - start)
+            errors += ok is False
+        return self.record(name, size, samples, errors)
+
+
+def synthetic_pages(fake, video_id, size):
+    for start in range(0, size, PAGE_SIZE):
+        yield [fake.comment(video_id, position) for position in range(start, min(start + PAGE_SIZE, size))]
+
+
+async def bench_parsing_and_filters(runner, server, fake, size):
+    """Bot scoring plus parsing per API page, then each draw filter over the whole pool"""
+    video_id = f'p{size:07d}xx0'
+    fake.add_video(video_id, size)
+    pages = list(synthetic_pages(fake, video_id, size))
+
+    pool = server.CommentPool()
+    samples = []
+    for attempt in range(runner.args.runs):
+        start = time.perf_counter()
+        for items in pages:
+            comments = server.parse_comment_page(items)
+            if attempt == 0:
+                for comment in comments:
+                    pool.append(comment.model_dump())
+        samples.append(time.perf_counter() - start)
+    runner.record('parse_and_bot_score', size, samples)
+    del pages
+
+    for case, overrides in FILTER_CASES.items():
+        request = server.PickWinnersRequest(client_seed='benchmark', **overrides)
+        samples = []
+        for _ in range(runner.args.runs):
+            start = time.perf_counter()
+            await server.build_eligible_pool(pool, request)
+            samples.append(time.perf_counter() - start)
+        runner.record(f'filter:{case}', size, samples)
+
+    key = server.draw_key('0' * 64, 'benchmark', '')
+    samples = []
+    for _ in range(runner.args.runs):
+        start = time.perf_counter()
+        server.hash_pool(pool, range(len(pool)))
+        server.sample_indices(key, len(pool), 10)
+        samples.append(time.perf_counter() - start)
+    runner.record('draw:hash_and_sample', size, samples)
+
+
+async def bench_endpoints(runner, server, fake, api, size):
+    """fetch-comments cold and cached, then pick-winners from the resulting session"""
+    sessions = []
+
+    async def cold_fetch(attempt):
+        # A fresh video per run so nothing comes from the cache or an in-flight fetch
+        video_id = f'f{size:07d}r{attempt:02d}'
+        fake.add_video(video_id, size)
+        response = await api.post('/api/youtube/fetch-comments', json={'video_url': video_id, 'max_comments': size})
+        if response.status_code != 200:
+            return False
+        sessions.append(response.json()['session_id'])
+        return True
+
+    async def cached_fetch(attempt):
+        response = await api.post('/api/youtube/fetch-comments', json={'video_url': f'f{size:07d}r00', 'max_comments': size})
+        return response.status_code == 200 and response.json()['cached']
+
+    await runner.timed('fetch-comments:cold', size, cold_fetch)
+    if not sessions:
+        print(f"  every cold fetch failed at {size:,} comments, skipping the draws")
+        return
+    await runner.timed('fetch-comments:cached', size, cached_fetch)
+
+    def draw(overrides):
+        async def run(attempt):
+            response = await api.post('/api/youtube/pick-winners', json={
+                'session_id': sessions[0], 'winner_count': 10, 'client_seed': 'benchmark', **overrides
+            })
+            return response.status_code == 200
+        return run
+
+    await runner.timed('pick-winners:streamed', size, draw({}))
+    await runner.timed('pick-winners:keyword', size, draw({'keyword_filter': 'giveaway'}))
+    await runner.timed('pick-winners:near_duplicates', size, draw({'near_duplicates': 'exclude'}))
+
+
+def compare_to_baseline(results, baseline_path, tolerance):
+    baseline = {(r['name'], r['size']): r for r in json.loads(Path(baseline_path).read_text())['results']}
+    regressions = []
+    for result in results:
+        before = baseline.get((result['name'], result['size']))
+        if before and result['median_s'] > before['median_s'] * (1 + tolerance):
+            regressions.append((result, before))
+
+    for result, before in regressions:
+        print(f"❌ {result['name']} at {result['size']:,}: {before['median_s'] * 1000:.1f} ms -> "
+              f"{result['median_s'] * 1000:.1f} ms")
+    if not regressions:
+        print(f"✅ No median slower than the baseline by more than {tolerance:.0%}")
+    return not regressions
+
+
+async def run(args, runner):
+    import httpx
+    import fake_youtube
+    import server
+
+    # The limiter would turn repeated runs into 429s; it is not what is measured here
+    server.rate_limiter.limits = {route: (10 ** 9, window) for route, (_, window) in server.RATE_LIMITS.items()}
+    fake = fake_youtube.FakeYouTube(page_latency_ms=args.page_latency_ms, error_rate=args.error_rate)
+    server.youtube_client = server.YouTubeClient(
+        server.YOUTUBE_API_KEY, base_url='http://fake-youtube',
+        transport=httpx.ASGITransport(app=fake_youtube.create_app(fake))
+    )
+
+    await server.client.drop_database(args.db_name)
+    for handler in server.app.router.on_startup:
+        await handler()
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app),
+                                     base_url='http://benchmark', timeout=None) as api:
+            for size in args.sizes:
+                print(f"\n📊 {size:,} comments")
+                await bench_parsing_and_filters(runner, server, fake, size)
+                await bench_endpoints(runner, server, fake, api, size)
+    finally:
+        if not args.keep_data:
+            await server.client.drop_database(args.db_name)
+        for handler in server.app.router.on_shutdown:
+            await handler()
+
+    print(f"\nFake YouTube calls: {fake.calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,100000,1000000',
+                        type=lambda value: [int(size) for size in value.split(',')],
+                        help="comma-separated comment counts to benchmark at")
+    parser.add_argument('--runs', type=int, default=3, help="timed runs per benchmark")
+    parser.add_argument('--page-latency-ms', type=float, default=0, help="delay the fake API adds to every call")
+    parser.add_argument('--error-rate', type=float, default=0, help="share of fake API calls that fail")
+    parser.add_argument('--db-name', default='comment_picker_benchmark', help="scratch database, dropped on every run")
+    parser.add_argument('--keep-data', action='store_true', help="leave the scratch database in place afterwards")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--baseline', help="results file from an earlier run to compare medians against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    # Set before the server module reads its configuration
+    os.environ['DB_NAME'] = args.db_name
+    os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+    os.environ['YOUTUBE_API_KEY'] = 'benchmark'
+    os.environ['YOUTUBE_DAILY_QUOTA'] = str(10 ** 9)
+
+    runner = BenchmarkRunner(args)
+    asyncio.run(run(args, runner))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'page_latency_ms': args.page_latency_ms,
+            'error_rate': args.error_rate,
+            'runs': args.runs,
+            'results': runner.results,
+        }, indent=2))
+        print(f"Results written to {args.json}")
+
+    if args.baseline and not compare_to_baseline(runner.results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
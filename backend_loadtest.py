@@ -0,0 +1,293 @@
+"""Load generator for the comment picker API.
+
+Drives /api/youtube/fetch-comments and /api/youtube/pick-winners with many
+concurrent virtual users, each with its own client IP so the per-IP rate
+limits apply as they would in production. Scenarios:
+
+    burst     every user fetches the same video and draws from it (a giveaway going live)
+    distinct  every fetch is for a video nobody has fetched yet
+    reroll    every user re-draws one session, excluding the winners drawn so far
+    mixed     a weighted blend of the three
+
+By default the app runs in-process against backend/fake_youtube.py and a
+scratch MongoDB database:
+
+    MONGO_URL=mongodb://localhost:27017 python backend_loadtest.py --scenario mixed --users 50 --duration 30
+
+To load a real worker instead, start the fake API and the backend with the
+proxy headers trusted, so each virtual user's X-Forwarded-For is its IP:
+
+    cd backend
+    uvicorn fake_youtube:app --port 8002
+    YOUTUBE_API_BASE_URL=http://127.0.0.1:8002 uvicorn server:app --port 8001 \\
+        --proxy-headers --forwarded-allow-ips 127.0.0.1
+    python ../backend_loadtest.py --url http://127.0.0.1:8001 --scenario burst
+
+Event-loop lag is measured on the loop serving the app in-process, and on
+the load generator's own loop with --url.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+SCENARIOS = ('burst', 'distinct', 'reroll', 'mixed')
+MIXED_WEIGHTS = {'burst': 0.5, 'distinct': 0.2, 'reroll': 0.3}
+LAG_INTERVAL = 0.01       # seconds between event-loop lag probes
+REROLL_EXCLUDED_MAX = 500  # excluded_authors sent per re-roll, newest winners first
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies = {}  # endpoint -> seconds
+        self.statuses = {}   # endpoint -> {status: count}
+        self.loop_lag = []
+
+    def record(self, endpoint, status, seconds):
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        counts = self.statuses.setdefault(endpoint, {})
+        counts[status] = counts.get(status, 0) + 1
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for endpoint, latencies in self.latencies.items():
+            statuses = self.statuses[endpoint]
+            endpoints[endpoint] = {
+                'requests': len(latencies),
+                'throughput_per_s': len(latencies) / elapsed,
+                'p50_ms': percentile(latencies, 0.5) * 1000,
+                'p95_ms': percentile(latencies, 0.95) * 1000,
+                'p99_ms': percentile(latencies, 0.99) * 1000,
+                'max_ms': max(latencies) * 1000,
+                'rate_limited_share': statuses.get(429, 0) / len(latencies),
+                'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+            }
+        lag = self.loop_lag or [0.0]
+        return {
+            'elapsed_s': elapsed,
+            'endpoints': endpoints,
+            'loop_lag_ms': {
+                'p50': percentile(lag, 0.5) * 1000,
+                'p99': percentile(lag, 0.99) * 1000,
+                'max': max(lag) * 1000,
+                'mean': statistics.mean(lag) * 1000,
+            },
+        }
+
+
+async def watch_loop_lag(stats, stop):
+    """Sleep for a fixed interval and record how late the loop woke us up"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        stats.loop_lag.append(max(0.0, loop.time() - start - LAG_INTERVAL))
+
+
+class VirtualUser:
+    def __init__(self, number, api, stats, state, args):
+        self.ip = f'10.{number // 65536 % 256}.{number // 256 % 256}.{number % 256}'
+        self.api = api
+        self.stats = stats
+        self.state = state
+        self.args = args
+        self.rng = random.Random(f'{args.seed}:{number}')
+
+    async def call(self, endpoint, payload):
+        start = time.perf_counter()
+        try:
+            response = await self.api.post(endpoint, json=payload, headers={'X-Forwarded-For': self.ip})
+            status = response.status_code
+            body = response.json() if status == 200 else None
+        except Exception as e:
+            status, body = type(e).__name__, None
+        self.stats.record(endpoint, status, time.perf_counter() - start)
+        return body
+
+    async def fetch(self, video_id):
+        return await self.call('/api/youtube/fetch-comments', {
+            'video_url': video_id, 'max_comments': self.args.max_comments
+        })
+
+    async def draw(self, session_id, excluded_authors=()):
+        return await self.call('/api/youtube/pick-winners', {
+            'session_id': session_id,
+            'winner_count': self.args.winners,
+            'excluded_authors': list(excluded_authors),
+        })
+
+    async def burst(self):
+        fetched = await self.fetch(self.state['burst_video'])
+        if fetched:
+            await self.draw(fetched['session_id'])
+
+    async def distinct(self):
+        fetched = await self.fetch(f"lt{next(self.state['video_numbers']):09d}")
+        if fetched:
+            await self.draw(fetched['session_id'])
+
+    async def reroll(self):
+        excluded = self.state['rerolled_winners']
+        drawn = await self.draw(self.state['reroll_session'], excluded[-REROLL_EXCLUDED_MAX:][::-1])
+        if drawn:
+            excluded.extend(winner['author'] for winner in drawn['winners'])
+
+    async def run(self, scenario, deadline):
+        while time.perf_counter() < deadline:
+            if scenario == 'mixed':
+                step = self.rng.choices(list(MIXED_WEIGHTS), weights=list(MIXED_WEIGHTS.values()))[0]
+            else:
+                step = scenario
+            await getattr(self, step)()
+            # Always yield: in-process, a rejected request can complete
+            # without ever suspending and would starve everything else
+            await asyncio.sleep(self.rng.expovariate(1000 / self.args.think_ms) if self.args.think_ms else 0)
+
+
+async def prepare(api, args):
+    """Fetch the shared videos once so burst and re-roll users find them ready"""
+    state = {
+        'burst_video': 'ltburst0001',
+        'video_numbers': itertools.count(),
+        'rerolled_winners': [],
+        'reroll_session': None,
+    }
+    if args.scenario in ('reroll', 'mixed'):
+        response = await api.post('/api/youtube/fetch-comments', json={
+            'video_url': 'ltreroll001', 'max_comments': args.max_comments
+        }, headers={'X-Forwarded-For': '10.255.255.254'})
+        response.raise_for_status()
+        state['reroll_session'] = response.json()['session_id']
+    return state
+
+
+async def run_load(api, args):
+    stats = LoadStats()
+    state = await prepare(api, args)
+    stop = asyncio.Event()
+    lag_watcher = asyncio.create_task(watch_loop_lag(stats, stop))
+
+    start = time.perf_counter()
+    deadline = start + args.duration
+    users = [VirtualUser(number, api, stats, state, args) for number in range(args.users)]
+    await asyncio.gather(*(user.run(args.scenario, deadline) for user in users))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await lag_watcher
+    return stats.summary(elapsed)
+
+
+async def run_in_process(args):
+    import httpx
+    import fake_youtube
+    import server
+
+    fake = fake_youtube.FakeYouTube(
+        default_comments=args.comments, page_latency_ms=args.page_latency_ms, error_rate=args.error_rate
+    )
+    server.youtube_client = server.YouTubeClient(
+        server.YOUTUBE_API_KEY, base_url='http://fake-youtube',
+        transport=httpx.ASGITransport(app=fake_youtube.create_app(fake))
+    )
+
+    await server.client.drop_database(args.db_name)
+    for handler in server.app.router.on_startup:
+        await handler()
+    try:
+        # ASGITransport reports one client address for every request, so the
+        # virtual users' IPs are applied the way uvicorn's proxy headers would
+        app = forwarded_for(server.app)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                     base_url='http://loadtest', timeout=None) as api:
+            return await run_load(api, args)
+    finally:
+        if not args.keep_data:
+            await server.client.drop_database(args.db_name)
+        for handler in server.app.router.on_shutdown:
+            await handler()
+
+
+def forwarded_for(app):
+    async def with_client_ip(scope, receive, send):
+        if scope['type'] == 'http':
+            for name, value in scope['headers']:
+                if name == b'x-forwarded-for':
+                    scope = {**scope, 'client': (value.decode().split(',')[0].strip(), 0)}
+                    break
+        await app(scope, receive, send)
+    return with_client_ip
+
+
+async def run_remote(args):
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as api:
+        return await run_load(api, args)
+
+
+def print_summary(summary, args):
+    print(f"\n🚦 {args.scenario}: {args.users} users for {summary['elapsed_s']:.1f}s")
+    for endpoint, result in summary['endpoints'].items():
+        print(f"  {endpoint}")
+        print(f"    {result['requests']:,} requests, {result['throughput_per_s']:.1f}/s, "
+              f"429s {result['rate_limited_share']:.1%}, statuses {result['statuses']}")
+        print(f"    p50 {result['p50_ms']:.1f} ms  p95 {result['p95_ms']:.1f} ms  "
+              f"p99 {result['p99_ms']:.1f} ms  max {result['max_ms']:.1f} ms")
+    lag = summary['loop_lag_ms']
+    where = 'load generator' if args.url else 'app'
+    print(f"  event-loop lag ({where}): p50 {lag['p50']:.1f} ms  p99 {lag['p99']:.1f} ms  max {lag['max']:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenario', choices=SCENARIOS, default='mixed')
+    parser.add_argument('--users', type=int, default=50, help="concurrent virtual users, one client IP each")
+    parser.add_argument('--duration', type=float, default=30, help="seconds to generate load for")
+    parser.add_argument('--think-ms', type=float, default=250, help="mean pause between a user's actions")
+    parser.add_argument('--max-comments', type=int, default=500, help="max_comments sent with each fetch")
+    parser.add_argument('--winners', type=int, default=1, help="winner_count sent with each draw")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--url', help="load a running server instead of the in-process app")
+    parser.add_argument('--timeout', type=float, default=60, help="per-request timeout with --url")
+    parser.add_argument('--comments', type=int, default=2000, help="comments per fake video, in-process only")
+    parser.add_argument('--page-latency-ms', type=float, default=50, help="fake API latency per call, in-process only")
+    parser.add_argument('--error-rate', type=float, default=0, help="share of fake API calls that fail, in-process only")
+    parser.add_argument('--db-name', default='comment_picker_loadtest', help="scratch database, dropped on every run")
+    parser.add_argument('--keep-data', action='store_true', help="leave the scratch database in place afterwards")
+    parser.add_argument('--json', help="write the summary to this file")
+    args = parser.parse_args()
+
+    if args.url:
+        summary = asyncio.run(run_remote(args))
+    else:
+        # Set before the server module reads its configuration
+        os.environ['DB_NAME'] = args.db_name
+        os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+        os.environ['YOUTUBE_API_KEY'] = 'loadtest'
+        os.environ['YOUTUBE_DAILY_QUOTA'] = str(10 ** 9)
+        summary = asyncio.run(run_in_process(args))
+
+    print_summary(summary, args)
+    if args.json:
+        Path(args.json).write_text(json.dumps({'scenario': args.scenario, 'users': args.users, **summary}, indent=2))
+        print(f"Summary written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
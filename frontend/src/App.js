@@ -19,6 +19,7 @@ function App() {
   const [loading, setLoading] = useState(false);
   const [videoInfo, setVideoInfo] = useState(null);
   const [comments, setComments] = useState([]);
+  const [sessionId, setSessionId] = useState(null);
   const [botsDetected, setBotsDetected] = useState(0);
   const [excludeDuplicates, setExcludeDuplicates] = useState(true);
   const [keywordFilter, setKeywordFilter] = useState("");
@@ -47,6 +48,7 @@ function App() {
       
       setVideoInfo(response.data.video_info);
       setComments(response.data.comments);
+      setSessionId(response.data.session_id);
       setBotsDetected(response.data.bots_detected);
       setWinners([]);
       setPreviousWinners([]);  // Reset previous winners for new video
@@ -89,7 +91,8 @@ function App() {
 
     try {
      const response = await axios.post(`${API}/youtube/pick-winners`, {
-          comments: comments,
+          // The server keeps the fetched comments; only send them if there is no session
+          ...(sessionId ? { session_id: sessionId } : { comments: comments }),
           exclude_duplicates: excludeDuplicates,
           keyword_filter: keywordFilter,
           winner_count: parseInt(winnerCount),
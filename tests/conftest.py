@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+# server reads these at import; the helpers under test never touch the database
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'comment_picker_test')
+os.environ.setdefault('YOUTUBE_API_KEY', 'test')
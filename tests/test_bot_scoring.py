@@ -0,0 +1,61 @@
+import time
+
+import fake_youtube
+import server
+
+PAGE_SIZE = 100
+
+
+def score(*comments):
+    authors, texts = zip(*comments)
+    return server.score_comment_batch(list(authors), list(texts), ['2025-01-01T00:00:00Z'] * len(comments))
+
+
+def test_plain_comments_score_zero():
+    assert score(('@viewer1', 'Love this video, pick me please'), ('@viewer2', 'first')) == [(0.0, ()), (0.0, ())]
+
+
+def test_text_signals():
+    (_, link), (_, phone), (_, promo) = score(
+        ('@a', 'free gifts at https://bit.ly/x'),
+        ('@b', 'call +1 (555) 010-9999 now'),
+        ('@c', 'You were SELECTED, check\tmy channel'),
+    )
+    assert link == ('link',)
+    assert phone == ('phone_number',)
+    assert promo == ('promo_phrase',)
+
+
+def test_congratulations_is_not_promo_or_repeated():
+    results = score(*[(f'@viewer{i}', 'Congratulations!') for i in range(5)])
+    assert all(reasons == () for _, reasons in results)
+
+
+def test_long_text_from_several_authors_is_repeated():
+    results = score(('@a', 'Amazing giveaway, I hope I win this time'), ('@b', 'amazing giveaway i hope i win this time!!'))
+    assert all('repeated_text' in reasons for _, reasons in results)
+
+
+def test_author_signals():
+    published = ['2025-01-01T00:00:00Z', '2025-01-01T00:00:30Z', '2025-01-01T00:01:00Z', '2025-01-01T00:00:00Z']
+    authors = ['@spammer', '@spammer', '@spammer', '@user-k6d']
+    results = server.score_comment_batch(authors, ['one', 'two', 'three', 'hi'], published)
+    assert results[0][1] == ('comment_burst',)
+    assert results[3][1] == ('handle_suffix',)
+
+
+def test_scores_100k_comments_well_under_a_second():
+    fake = fake_youtube.FakeYouTube(default_comments=100_000)
+    snippets = [fake.comment('benchmark01', position)['snippet']['topLevelComment']['snippet'] for position in range(100_000)]
+    authors = [s['authorDisplayName'] for s in snippets]
+    texts = [s['textDisplay'] for s in snippets]
+    published_ats = [s['publishedAt'] for s in snippets]
+
+    # Best of three runs, so one slow run on a busy machine does not fail the test
+    samples = []
+    for _ in range(3):
+        start = time.perf_counter()
+        for i in range(0, len(snippets), PAGE_SIZE):
+            server.score_comment_batch(authors[i:i + PAGE_SIZE], texts[i:i + PAGE_SIZE], published_ats[i:i + PAGE_SIZE])
+        samples.append(time.perf_counter() - start)
+    assert min(samples) < 1
@@ -0,0 +1,45 @@
+import base64
+
+import orjson
+import pytest
+from fastapi import HTTPException
+
+import server
+
+STATE = {'generation': 'g1', 'sort': 'newest', 'q': None, 'key': '2025-01-01T00:00:00Z', 'comment_id': 'c1'}
+
+
+def raw_cursor(state):
+    return base64.urlsafe_b64encode(orjson.dumps(state)).rstrip(b'=').decode()
+
+
+def assert_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        server.decode_browse_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_round_trip():
+    assert server.decode_browse_cursor(server.encode_browse_cursor(STATE)) == STATE
+    likes = {**STATE, 'sort': 'likes', 'key': 12}
+    assert server.decode_browse_cursor(server.encode_browse_cursor(likes)) == likes
+
+
+@pytest.mark.parametrize('changes', [
+    {'key': {'$gt': ''}},
+    {'key': ['2025-01-01T00:00:00Z']},
+    {'comment_id': {'$ne': None}},
+    {'generation': 1},
+    {'sort': ['newest']},
+    {'sort': 'random'},
+    {'sort': 'likes', 'key': '12'},
+    {'sort': 'likes', 'key': True},
+])
+def test_rejects_keys_that_are_not_plain_values(changes):
+    assert_rejected(raw_cursor({**STATE, **changes}))
+
+
+def test_rejects_malformed_cursors():
+    assert_rejected('not base64!')
+    assert_rejected(raw_cursor(['a', 'list']))
+    assert_rejected(raw_cursor({'sort': 'newest'}))
@@ -0,0 +1,21 @@
+import server
+
+
+def test_prefers_brotli_when_both_are_accepted():
+    assert server.pick_response_encoding('gzip, deflate, br') == 'br'
+
+
+def test_q_zero_refuses_a_coding():
+    assert server.pick_response_encoding('br;q=0, gzip') == 'gzip'
+    assert server.pick_response_encoding('br; q=0, gzip;q=0') is None
+
+
+def test_higher_q_wins():
+    assert server.pick_response_encoding('br;q=0.5, gzip;q=0.8') == 'gzip'
+
+
+def test_wildcard_and_missing_header():
+    assert server.pick_response_encoding('*') == 'br'
+    assert server.pick_response_encoding('*;q=0, gzip') == 'gzip'
+    assert server.pick_response_encoding('') is None
+    assert server.pick_response_encoding('identity') is None
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import server
+
+SEED = 'ab' * 32
+
+
+def make_comments(count):
+    return [
+        server.Comment(
+            comment_id=f'c{i:05d}',
+            author=f'@viewer{i % 40}',
+            text=f'comment number {i} about the giveaway',
+            author_channel_url=f'http://www.youtube.com/@viewer{i % 40}',
+            author_profile_image_url='https://yt3.ggpht.com/test',
+            published_at=f'2025-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}Z',
+            like_count=i % 7,
+            is_bot=i % 13 == 0,
+        )
+        for i in range(count)
+    ]
+
+
+def record_draw(pool, eligible, winner_count, client_seed=None):
+    """Build the record run_draw stores, without the database"""
+    pool_hash = server.hash_pool(pool, eligible)
+    indices = server.sample_indices(server.draw_key(SEED, client_seed, pool_hash), len(eligible), winner_count)
+    return {
+        'draw_id': 'test',
+        'algorithm': server.DRAW_ALGORITHM,
+        'pool_hash': pool_hash,
+        'pool_size': len(eligible),
+        'seed_commitment': server.hashlib.sha256(SEED.encode()).hexdigest(),
+        'seed': SEED,
+        'client_seed': client_seed,
+        'winner_indices': indices,
+        'winner_ids': [pool.entry_key(eligible[i]) for i in indices],
+    }
+
+
+def eligible_positions(pool, **filters):
+    return asyncio.run(server.build_eligible_pool(pool, server.PickWinnersRequest(**filters)))
+
+
+def test_seeded_draw_is_deterministic():
+    key = server.draw_key(SEED, 'viewer-chosen', 'f' * 64)
+    picks = server.sample_indices(key, 1000, 10)
+
+    assert picks == server.sample_indices(key, 1000, 10)
+    assert len(set(picks)) == 10
+    assert all(0 <= i < 1000 for i in picks)
+    assert picks != server.sample_indices(server.draw_key(SEED, 'another-seed', 'f' * 64), 1000, 10)
+
+
+def test_replay_reproduces_recorded_draw():
+    pool = server.CommentPool.from_comments(make_comments(500))
+    eligible = eligible_positions(pool, exclude_duplicates=True)
+    record = record_draw(pool, eligible, 5, client_seed='viewer-chosen')
+
+    assert server.replay_draw(record) == record['winner_indices']
+    result = server.check_replay(record, pool, eligible)
+    assert result.verified and result.pool_hash_matches and result.winners_match
+
+
+def test_changed_pool_fails_verification():
+    comments = make_comments(500)
+    pool = server.CommentPool.from_comments(comments)
+    eligible = eligible_positions(pool)
+    record = record_draw(pool, eligible, 5)
+
+    # Swap in one different comment, as if the stored set had been edited after the draw
+    comments[eligible[0]] = comments[eligible[0]].model_copy(update={'comment_id': 'forged'})
+    tampered = server.CommentPool.from_comments(comments)
+    result = server.check_replay(record, tampered, eligible_positions(tampered))
+
+    assert not result.pool_hash_matches
+    assert not result.verified
+
+
+def test_selection_work_grows_with_winners_not_pool(monkeypatch):
+    calls = []
+    uniform_below = server.uniform_below
+
+    def counting_uniform_below(key, counter, bound):
+        calls.append(bound)
+        return uniform_below(key, counter, bound)
+
+    monkeypatch.setattr(server, 'uniform_below', counting_uniform_below)
+    key = server.draw_key(SEED, None, 'f' * 64)
+
+    # A pool far too large to materialise: an O(n) shuffle could not finish
+    start = time.perf_counter()
+    picks = server.sample_indices(key, 10 ** 15, 25)
+    assert time.perf_counter() - start < 1
+
+    assert len(calls) == 25
+    assert len(set(picks)) == 25
+    assert all(0 <= i < 10 ** 15 for i in picks)
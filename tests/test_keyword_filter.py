@@ -0,0 +1,41 @@
+import server
+
+
+def matcher(keywords, whole_word=False, match_all=False):
+    return server.KeywordMatcher(keywords, whole_word=whole_word, match_all=match_all)
+
+
+def test_any_mode_needs_one_keyword():
+    m = matcher(['giveaway', 'pick me'])
+    assert m.matches('Please PICK ME!')
+    assert m.matches('great giveaway')
+    assert not m.matches('nice video')
+
+
+def test_all_mode_needs_every_keyword():
+    m = matcher(['love', 'video'], match_all=True)
+    assert m.matches('Love this video')
+    assert not m.matches('love it')
+
+
+def test_all_mode_counts_a_keyword_inside_a_longer_one():
+    m = matcher(['give', 'giveaway'], match_all=True)
+    assert m.matches('giveaway')
+    assert not matcher(['give', 'giveaway'], whole_word=True, match_all=True).matches('giveaway')
+
+
+def test_whole_word_matching():
+    m = matcher(['cat'], whole_word=True)
+    assert m.matches('my cat, Tom')
+    assert not m.matches('concatenate')
+    assert matcher(['cat']).matches('concatenate')
+
+
+def test_casefolding():
+    assert matcher(['STRASSE']).matches('die Straße')
+    assert matcher(['straße']).matches('STRASSE')
+
+
+def test_filter_without_keywords():
+    assert server.get_keyword_matcher(' , ,', False, False) is None
+    assert server.get_keyword_matcher('a, b', False, True).keywords == {'a', 'b'}
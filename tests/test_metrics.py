@@ -0,0 +1,10 @@
+import server
+
+
+def test_label_values_are_escaped():
+    labels = (('path', 'C:\\tmp'), ('detail', 'say "hi"\nbye'), ('status', 200))
+    assert server.format_labels(labels) == '{path="C:\\\\tmp",detail="say \\"hi\\"\\nbye",status="200"}'
+
+
+def test_no_labels():
+    assert server.format_labels(()) == ''
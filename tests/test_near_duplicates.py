@@ -0,0 +1,48 @@
+import server
+
+SPAM = 'Congratulations you have won, message me on telegram to claim your prize'
+OTHER_TEXTS = [
+    'This tutorial finally made recursion click for me, thank you',
+    'The editing on this one is on another level, great job team',
+    'I have watched every video on this channel since the very start',
+]
+
+
+def make_pool(comments):
+    return server.CommentPool.from_comments([
+        server.Comment(
+            comment_id=f'c{i}',
+            author=author,
+            text=text,
+            author_channel_url='',
+            author_profile_image_url='',
+            published_at=f'2025-01-01T00:00:{i:02d}Z',
+            like_count=0,
+        )
+        for i, (author, text) in enumerate(comments)
+    ])
+
+
+def test_near_identical_texts_share_a_cluster():
+    texts = [SPAM, SPAM.upper() + '!!!', SPAM.replace('prize', 'prizes'), *OTHER_TEXTS, 'me please']
+    labels = server.find_near_duplicate_clusters(texts)
+
+    assert labels[0] == labels[1] == labels[2] >= 0
+    distinct = labels[3:6]
+    assert len(set(distinct)) == 3 and labels[0] not in distinct
+    assert labels[6] == -1  # too short to compare
+
+
+def test_no_candidates():
+    assert server.find_near_duplicate_clusters(['hi', 'first']) == [-1, -1]
+
+
+def test_exclude_and_collapse_only_touch_clusters_across_authors():
+    pool = make_pool([
+        ('@bot1', SPAM), ('@viewer', OTHER_TEXTS[0]), ('@bot2', SPAM + '!'),
+        ('@fan', OTHER_TEXTS[1]), ('@fan', OTHER_TEXTS[1]),
+    ])
+    positions = list(range(len(pool)))
+
+    assert server.filter_near_duplicates(pool, positions, 'exclude') == [1, 3, 4]
+    assert server.filter_near_duplicates(pool, positions, 'collapse') == [0, 1, 3, 4]
@@ -0,0 +1,45 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=999_960.0)  # The start of a 60-second window
+    monkeypatch.setattr(server, 'time', SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def limiter(limit=3, window=60):
+    return server.RateLimiter(server.InMemoryRateLimitBackend(100, 2 * window), {'fetch': (limit, window)})
+
+
+def hits(rate_limiter, count, client='1.2.3.4'):
+    return [asyncio.run(rate_limiter.allow('fetch', client)) for _ in range(count)]
+
+
+def test_allows_the_limit_then_rejects(clock):
+    rate_limiter = limiter()
+    assert hits(rate_limiter, 4) == [True, True, True, False]
+
+
+def test_clients_are_counted_separately(clock):
+    rate_limiter = limiter()
+    hits(rate_limiter, 3)
+    assert hits(rate_limiter, 1, client='5.6.7.8') == [True]
+
+
+def test_previous_window_is_weighted_by_its_overlap(clock):
+    rate_limiter = limiter(limit=4)
+    hits(rate_limiter, 4)
+
+    # A quarter into the next window, three quarters of the last four still count
+    clock.value += 75
+    assert hits(rate_limiter, 2) == [True, False]
+
+    # Once a whole window has passed the old hits no longer count
+    clock.value += 120
+    assert hits(rate_limiter, 4) == [True] * 4